@@ -0,0 +1,124 @@
+# Parity check and throughput of engine.batch.BatchEnv against the scalar engine
+#
+#   python -m benchmarks.batch --boards 256 --steps 600
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from settings import SIGHT_RANGE, RED_MOVE_PROB
+from engine.batch import BatchEnv, MOVES, RED_DX, RED_DY
+from engine.entities import Player
+from engine.simulation import setupBoard, SEATS
+from engine.vision import extractObservation, TILE_GREEN, TILE_RED, TILE_PLAYER
+
+TAGS = {TILE_GREEN: "GREEN", TILE_RED: "RED", TILE_PLAYER: "PLAYER"}
+
+def scalarBoards(seeds):
+    return [setupBoard([Player(agentId, color, None) for agentId, color in SEATS], seed) for seed in seeds]
+
+def windowItems(window, pos):
+    # Batch window -> {(x, y, tag)} in board coordinates
+    r = SIGHT_RANGE
+    items = set()
+    for wy, wx in zip(*np.nonzero((window > 0) & (window != 255))):
+        items.add((int(pos[0] + wx - r), int(pos[1] + wy - r), TAGS[int(window[wy, wx])]))
+    return items
+
+def boardState(board, tick):
+    return ([(p.x, p.y, p.score) for p in board.players], sorted(board.greens),
+            [(r.x, r.y) for r in board.reds], tick)
+
+def batchState(env, i):
+    P = env.numPlayers
+    players = [(int(env.px[i, j]), int(env.py[i, j]), int(env.score[i, j])) for j in range(P)]
+    gy, gx = np.nonzero(env.greens[i])
+    greens = sorted(zip(gx.tolist(), gy.tolist()))
+    reds = [(int(env.rx[i, k]), int(env.ry[i, k])) for k in range(env.rx.shape[1]) if env.redAlive[i, k]]
+    return (players, greens, reds, int(env.ticks[i]))
+
+def checkParity(seeds, steps, seed=0):
+    """Drive BatchEnv and scalar boards with the same moves and red decisions; return mismatch count."""
+    env = BatchEnv.fromSeeds(seeds, redSeed=seed)
+    boards = scalarBoards(seeds)
+    ticks = [0] * len(boards)
+    rng = np.random.default_rng(seed + 1)
+    mismatches = 0
+    for _ in range(steps):
+        live = env.live()
+        obs = env.observe()
+        moves = rng.integers(0, len(MOVES), size=env.n)
+        i = env.activeIdx
+        for k, board in enumerate(boards):
+            scalarLive = bool(board.greens) and ticks[k] < env.maxRounds
+            if scalarLive != bool(live[k]):
+                mismatches += 1
+            if not scalarLive:
+                continue
+            vis = extractObservation(board, board.players[i], ticks[k])["vision"]
+            if {(v["x"], v["y"], v["t"]) for v in vis} != windowItems(obs["window"][k], obs["pos"][k]):
+                mismatches += 1
+            board.players[i].applyMove(board, MOVES[moves[k]])
+        env.step(moves)
+        if env.activeIdx == 0:
+            for k, board in enumerate(boards):
+                if not live[k]:
+                    continue
+                for j, red in enumerate(board.reds):
+                    d = env.lastRedDirs[k, j]
+                    if d >= 0:
+                        red.moveBy(board, int(RED_DX[d]), int(RED_DY[d]))
+                ticks[k] += 1
+        for k, board in enumerate(boards):
+            if boardState(board, ticks[k]) != batchState(env, k):
+                mismatches += 1
+    return mismatches
+
+def scalarThroughput(seeds, steps):
+    boards = scalarBoards(seeds)
+    rng = random.Random(0)
+    redRng = random.Random(1)
+    P = len(SEATS)
+    t0 = time.perf_counter()
+    for s in range(steps):
+        i = s % P
+        for board in boards:
+            p = board.players[i]
+            extractObservation(board, p, 0)
+            p.applyMove(board, MOVES[rng.randrange(5)])
+            if i == P - 1:
+                for r in board.reds:
+                    r.tryMove(board, redRng, RED_MOVE_PROB)
+    return len(boards) * steps / (time.perf_counter() - t0)
+
+def batchThroughput(seeds, steps):
+    env = BatchEnv.fromSeeds(seeds, maxRounds=10**9)
+    rng = np.random.default_rng(0)
+    moves = rng.integers(0, len(MOVES), size=(steps, env.n))
+    t0 = time.perf_counter()
+    for s in range(steps):
+        env.observe()
+        env.step(moves[s])
+    return env.n * steps / (time.perf_counter() - t0)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="BatchEnv parity check and throughput.")
+    ap.add_argument("--boards", type=int, default=256)
+    ap.add_argument("--steps", type=int, default=600, help="single-agent steps (3 per round)")
+    ap.add_argument("--parity-boards", type=int, default=32)
+    args = ap.parse_args(argv)
+
+    bad = checkParity(list(range(args.parity_boards)), args.steps)
+    print(f"parity: {args.parity_boards} boards x {args.steps} steps, {bad} mismatches")
+
+    seeds = list(range(args.boards))
+    scalar = scalarThroughput(seeds, args.steps)
+    batch = batchThroughput(seeds, args.steps)
+    print(f"scalar: {scalar:,.0f} game-steps/s   batch: {batch:,.0f} game-steps/s   speed-up {batch / scalar:.1f}x")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# extract_json: corpus check + micro-benchmark against the previous regex version
+#
+#   python -m benchmarks.extract_json
+#   python -m benchmarks.extract_json --corpus benchmarks/data/llm_responses.jsonl --min-time 0.5
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+
+from controllers.rectangle_controller import extract_json
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "llm_responses.jsonl")
+
+def legacyExtractJson(text):
+    # extract_json as it was before the raw_decode scanner (fenced regex, greedy regex, retries)
+    m = re.search(r"```json\s*(\{.*?\})\s*```", text, flags=re.DOTALL | re.IGNORECASE)
+    if m:
+        try:
+            return json.loads(m.group(1))
+        except Exception:
+            pass
+    m = re.search(r"(\{.*\})", text, flags=re.DOTALL)
+    if m:
+        blob = m.group(1)
+        try:
+            return json.loads(blob)
+        except Exception:
+            try:
+                end = blob.rfind("}")
+                return json.loads(blob[:end + 1])
+            except Exception:
+                return None
+    return None
+
+def loadCorpus(path):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+def perCall(fn, text, minTime):
+    # Best-of-5 average seconds per call, each batch running for about minTime / 5
+    clock = time.perf_counter
+    n = 1
+    while True:
+        t0 = clock()
+        for _ in range(n):
+            fn(text)
+        if clock() - t0 >= minTime / 25 or n >= 1 << 20:
+            break
+        n *= 2
+    best = float("inf")
+    for _ in range(5):
+        t0 = clock()
+        for _ in range(n):
+            fn(text)
+        best = min(best, (clock() - t0) / n)
+    return best
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Validate extract_json on a response corpus and time it.")
+    ap.add_argument("--corpus", default=CORPUS)
+    ap.add_argument("--min-time", type=float, default=0.2, help="seconds spent per entry and function")
+    args = ap.parse_args(argv)
+
+    corpus = loadCorpus(args.corpus)
+    failures = 0
+    totalNew = totalOld = 0.0
+    logRatio = 0.0
+    print(f"  {'entry':<34} {'chars':>7} {'new us':>9} {'old us':>9} {'speed-up':>9}  legacy", file=sys.stderr)
+    for entry in corpus:
+        text, expected = entry["response"], entry["expected"]
+        got = extract_json(text)
+        if got != expected:
+            failures += 1
+            print(f"  FAIL {entry['name']}: expected {expected!r}, got {got!r}", file=sys.stderr)
+        old = legacyExtractJson(text)
+        tNew = perCall(extract_json, text, args.min_time)
+        tOld = perCall(legacyExtractJson, text, args.min_time)
+        totalNew += tNew
+        totalOld += tOld
+        logRatio += math.log(tOld / tNew)
+        print(f"  {entry['name']:<34} {len(text):>7} {tNew * 1e6:>9.1f} {tOld * 1e6:>9.1f} {tOld / tNew:>8.1f}x"
+              f"  {'ok' if old == expected else 'wrong'}", file=sys.stderr)
+
+    wrongOld = sum(legacyExtractJson(e["response"]) != e["expected"] for e in corpus)
+    print(f"{len(corpus)} responses: {len(corpus) - failures} correct (legacy {len(corpus) - wrongOld}); "
+          f"whole corpus {totalNew * 1e6:.0f} us vs {totalOld * 1e6:.0f} us ({totalOld / totalNew:.1f}x), "
+          f"geometric mean speed-up {math.exp(logRatio / len(corpus)):.1f}x",
+          file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+# Many LLM-driven matches at once against the local Synchange stub: direct clients vs LLMScheduler
+#
+#   python -m benchmarks.llm_scheduler
+#   python -m benchmarks.llm_scheduler --games 32 --distinct 8 --server-rps 80 --rate 60 --concurrency 12
+
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+
+from engine.config import MatchConfig
+from engine.simulation import Simulation
+from engine.telemetry import Telemetry, Histogram
+from controllers.llm_scheduler import LLMScheduler
+from benchmarks.synchange_stub import StubServer
+
+def mergeDecide(sims):
+    # One histogram over every game's rectangle decide() latency
+    merged = Histogram()
+    for sim in sims:
+        for (phase, _), h in sim.telemetry.items():
+            if phase != "decide":
+                continue
+            merged.counts = [a + b for a, b in zip(merged.counts, h.counts)]
+            merged.count += h.count
+            merged.total += h.total
+            merged.max = max(merged.max, h.max)
+    return merged
+
+def playGames(args, url, scheduler=None):
+    sims = []
+    for g in range(args.games):
+        cfg = MatchConfig(
+            agents=[{"controller": "rectangle", "options": {"api_url": url, "backoff": 0.05, "timeout": 5}}],
+            seed=100 + g % args.distinct, maxRounds=args.rounds)
+        sim = Simulation.fromConfig(cfg, telemetry=Telemetry())
+        for p in sim.turnOrder:
+            p.controller.scheduler = scheduler
+        sims.append(sim)
+
+    def play(sim):
+        while sim.step():
+            pass
+
+    threads = [threading.Thread(target=play, args=(sim,)) for sim in sims]
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the client prints every failed attempt
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    elapsed = time.perf_counter() - started
+    fallbacks = sum(p.controller.fallbacks for sim in sims for p in sim.turnOrder)
+    return elapsed, mergeDecide(sims), fallbacks
+
+def report(label, elapsed, decide, fallbacks, server, extra=""):
+    print(f"  {label:<10} {decide.count / elapsed:8.1f} decisions/s   decide p50 {decide.quantile(0.5) * 1e3:6.0f}"
+          f"  p95 {decide.quantile(0.95) * 1e3:6.0f}  p99 {decide.quantile(0.99) * 1e3:6.0f}  max {decide.max * 1e3:6.0f} ms",
+          file=sys.stderr)
+    print(f"  {'':<10} http {server['requests']}  429 {server['throttled']}  500 {server['errors']}"
+          f"  peak {server['peak_concurrent']}  fallbacks {fallbacks}{extra}", file=sys.stderr)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Throughput and tail latency of LLM matches with and without the scheduler.")
+    ap.add_argument("--games", type=int, default=16)
+    ap.add_argument("--distinct", type=int, default=4, help="distinct seeds; games sharing one send identical prompts")
+    ap.add_argument("--rounds", type=int, default=30)
+    ap.add_argument("--latency-ms", type=float, default=80.0)
+    ap.add_argument("--jitter-ms", type=float, default=40.0)
+    ap.add_argument("--error-rate", type=float, default=0.02)
+    ap.add_argument("--server-rps", type=float, default=60.0, help="stub answers 429 above this rate")
+    ap.add_argument("--concurrency", type=int, default=8, help="scheduler: requests in flight")
+    ap.add_argument("--rate", type=float, default=50.0, help="scheduler: token-bucket requests per second")
+    args = ap.parse_args(argv)
+
+    print(f"{args.games} games x {args.rounds} rounds ({args.distinct} distinct seeds), stub "
+          f"{args.latency_ms:.0f}+~{args.jitter_ms:.0f} ms, {args.error_rate:.0%} errors, {args.server_rps:.0f} req/s cap",
+          file=sys.stderr)
+    stubArgs = (0, args.latency_ms, args.jitter_ms, args.error_rate, args.server_rps)
+
+    with StubServer(*stubArgs) as stub:
+        elapsed, decide, fallbacks = playGames(args, stub.url)
+        report("direct", elapsed, decide, fallbacks, stub.stats())
+
+    scheduler = LLMScheduler(args.concurrency, args.rate)
+    with StubServer(*stubArgs) as stub:
+        elapsed, decide, fallbacks = playGames(args, stub.url, scheduler)
+        s = scheduler.stats()
+        report("scheduler", elapsed, decide, fallbacks, stub.stats(),
+               f"  coalesced {s['coalesced']}/{s['submitted']}  rate wait {s.get('rate_wait_s', 0):.1f} s")
+    scheduler.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# Round latency: sequential turns vs simultaneous rounds (threads / processes)
+#
+#   python -m benchmarks.rounds
+#   python -m benchmarks.rounds --latency-ms 80 --rounds 10 --mcts-ms 40
+
+import argparse
+import sys
+import time
+
+from engine.config import MatchConfig
+from engine.simulation import Simulation
+from engine.rounds import RoundDecider
+from controllers.triangle_controller import TriangleController
+from controllers.mcts_controller import MCTSController
+
+class SlowTriangle(TriangleController):
+    """Triangle heuristic behind a fixed delay, standing in for an I/O-bound LLM call."""
+    def __init__(self, latencyMs):
+        self.latency = latencyMs / 1000.0
+
+    def decide(self, obs):
+        time.sleep(self.latency)
+        return super().decide(obs)
+
+def playRounds(controllers, turnMode, rounds, decider=None):
+    cfg = MatchConfig(agents=[{"controller": "triangle"}] * len(controllers), turnMode=turnMode, seed=7)
+    sim = Simulation(cfg.createPlayers(), config=cfg, decider=decider)
+    for p, ctrl in zip(sim.turnOrder, controllers):
+        p.controller = ctrl
+    started = time.perf_counter()
+    while sim.tick < rounds and sim.step():
+        pass
+    return (time.perf_counter() - started) / max(sim.tick, 1), sim.results()
+
+def report(label, perRound, base):
+    print(f"  {label:<34} {perRound * 1000:8.1f} ms/round   {base / perRound:5.2f}x", file=sys.stderr)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare sequential and simultaneous round latency.")
+    ap.add_argument("--agents", type=int, default=3)
+    ap.add_argument("--rounds", type=int, default=8)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="simulated I/O latency per decision")
+    ap.add_argument("--mcts-ms", type=float, default=30.0, help="MCTS time budget per decision")
+    args = ap.parse_args(argv)
+    n = args.agents
+
+    print(f"I/O-bound: {n} agents, {args.latency_ms:.0f} ms per decision", file=sys.stderr)
+    slow = lambda: [SlowTriangle(args.latency_ms) for _ in range(n)]
+    seq, seqRes = playRounds(slow(), "sequential", args.rounds)
+    report("sequential", seq, seq)
+    same, sameRes = playRounds(slow(), "simultaneous", args.rounds)
+    report("simultaneous, no pool", same, seq)
+    decider = RoundDecider(threads=n)
+    par, parRes = playRounds(slow(), "simultaneous", args.rounds, decider)
+    decider.close()
+    report("simultaneous, threads", par, seq)
+    if parRes != sameRes:
+        print("  MISMATCH: threaded round results differ from the unpooled round", file=sys.stderr)
+        return 1
+
+    print(f"CPU-bound: {n} MCTS agents, {args.mcts_ms:.0f} ms budget", file=sys.stderr)
+    mcts = lambda: [MCTSController(timeBudgetMs=args.mcts_ms, seed=i) for i in range(n)]
+    seq, _ = playRounds(mcts(), "sequential", args.rounds)
+    report("sequential", seq, seq)
+    decider = RoundDecider(threads=n)
+    thr, _ = playRounds(mcts(), "simultaneous", args.rounds, decider)
+    decider.close()
+    report("simultaneous, threads (GIL)", thr, seq)
+    decider = RoundDecider(threads=n, processes=n)
+    proc, _ = playRounds(mcts(), "simultaneous", args.rounds, decider)
+    decider.close()
+    report("simultaneous, processes", proc, seq)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+# Benchmark suite for engine hot paths (headless, SDL dummy video driver)
+#
+#   python -m benchmarks.run                      # quick profile -> bench.json
+#   python -m benchmarks.run --full --out new.json
+#   python -m benchmarks.run --out new.json --compare base.json --threshold 0.15
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from settings import SCORES, SIGHT_RANGE, CELL, PANEL_W, RED_MOVE_PROB, GRID_W, GRID_H
+from engine.board import Board
+from engine.entities import Player
+from engine.vision import extractObservation, extractCompactObservation, IncrementalObserver
+from engine.simulation import Simulation, seatPlayers
+from engine.telemetry import Telemetry
+from controllers.triangle_controller import TriangleController
+from controllers.pentagon_controller import PentagonController
+
+QUICK = {
+    "sizes": [(40, 24), (200, 200)],
+    "counts": [10, 1000],
+}
+FULL = {
+    "sizes": [(40, 24), (200, 200), (1000, 1000)],
+    "counts": [10, 1000, 100_000],
+}
+
+# Render benchmarks need a real surface; skip boards whose screen would not fit in memory
+MAX_RENDER_BYTES = 256 * 1024 * 1024
+
+def makeBoard(w, h, greens, reds, seed=7):
+    board = Board(w, h, SCORES, seed)
+    for agentId, (x, y) in zip(("triangle", "rectangle", "pentagon"), ((2, 2), (w - 3, 2), (2, h - 3))):
+        board.addPlayer(Player(agentId, (200, 200, 200), None), x, y)
+    board.spawnGreens(greens)
+    board.spawnReds(reds)
+    return board
+
+def timeit(fn, minTime, maxCalls=100_000):
+    """Call fn repeatedly for at least minTime seconds; return per-call samples (seconds)."""
+    samples = []
+    clock = time.perf_counter
+    deadline = clock() + minTime
+    while len(samples) < maxCalls:
+        t0 = clock()
+        fn()
+        t1 = clock()
+        samples.append(t1 - t0)
+        if t1 >= deadline and len(samples) >= 5:
+            break
+    return samples
+
+def summarize(samples):
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    total = sum(s)
+    return {
+        "calls": len(s),
+        "ops_per_sec": len(s) / total if total else float("inf"),
+        "p50_us": pick(0.50) * 1e6,
+        "p95_us": pick(0.95) * 1e6,
+        "p99_us": pick(0.99) * 1e6,
+    }
+
+# ---------- Cases: each returns a zero-arg callable, or None to skip ----------
+
+def caseObservation(board):
+    p = board.players[0]
+    return lambda: extractObservation(board, p, 0)
+
+def caseCompactObservation(board):
+    p = board.players[0]
+    return lambda: extractCompactObservation(board, p, 0)
+
+def _turnObservation(board, incremental, sight=20):
+    # What changes between two observations: one own move, a few red moves, then observe
+    p = board.players[0]
+    moves = ["RIGHT", "DOWN", "LEFT", "UP"]
+    reds = board.reds[:8]
+    rng = random.Random(1)
+    observer = IncrementalObserver(board, p, sight) if incremental else None
+    state = {"i": 0}
+    def run():
+        state["i"] = (state["i"] + 1) & 3
+        p.applyMove(board, moves[state["i"]])
+        for r in reds:
+            r.tryMove(board, rng, RED_MOVE_PROB)
+        if observer is None:
+            extractObservation(board, p, 0, sight)
+        else:
+            observer.observe(0)
+    return run
+
+def caseTurnObservation(board):
+    return _turnObservation(board, incremental=False)
+
+def caseTurnObservationIncremental(board):
+    return _turnObservation(board, incremental=True)
+
+def caseApplyMove(board):
+    p = board.players[0]
+    moves = ["RIGHT", "DOWN", "LEFT", "UP"]
+    state = {"i": 0}
+    def run():
+        state["i"] = (state["i"] + 1) & 3
+        p.applyMove(board, moves[state["i"]])
+    return run
+
+def caseTryMove(board):
+    if not board.reds:
+        return None
+    rng = random.Random(1)
+    red = board.reds[0]
+    return lambda: red.tryMove(board, rng, RED_MOVE_PROB)
+
+def caseNpcPhase(board):
+    rng = random.Random(1)
+    return lambda: board.npcPhase(rng, RED_MOVE_PROB)
+
+def caseNpcPhaseVectorized(board):
+    import numpy as np
+    gen = np.random.default_rng(1)
+    return lambda: board.npcPhaseVectorized(gen, RED_MOVE_PROB)
+
+def caseSnapshotRestore(board):
+    # One lookahead ply: snapshot, a move for every player plus an NPC phase, rewind
+    rng = random.Random(1)
+    def run():
+        snap = board.snapshot(rng)
+        for p in board.players:
+            p.applyMove(board, "RIGHT")
+        for r in board.reds:
+            r.tryMove(board, rng, RED_MOVE_PROB)
+        board.restore(snap, rng)
+    return run
+
+def _decideCase(board, ctrl):
+    # Controllers cache per-turn state for the last observation object they saw; alternating
+    # between two equal observations (in the form the controller asks for) makes every call a new turn
+    extract = extractCompactObservation if ctrl.compactObservation else extractObservation
+    observations = [extract(board, board.players[0], tick) for tick in range(2)]
+    state = {"tick": 0}
+    def run():
+        state["tick"] ^= 1
+        ctrl.decide(observations[state["tick"]])
+    return run
+
+def caseTriangle(board):
+    return _decideCase(board, TriangleController())
+
+def casePentagon(board):
+    return _decideCase(board, PentagonController())
+
+def _simCase(board, telemetry):
+    # Whole turns of a default-size game (the board argument only selects the size)
+    if (board.w, board.h) != (GRID_W, GRID_H):
+        return None
+    state = {"sim": None}
+    def run():
+        sim = state["sim"]
+        if sim is None or not sim.step():
+            ctrls = [TriangleController(), PentagonController(), PentagonController()]
+            state["sim"] = Simulation(seatPlayers(ctrls), 7, telemetry=Telemetry() if telemetry else None)
+    return run
+
+def caseSimStep(board):
+    return _simCase(board, telemetry=False)
+
+def caseSimStepTelemetry(board):
+    return _simCase(board, telemetry=True)
+
+def _screenFor(board):
+    import pygame
+    w, h = board.w * CELL + PANEL_W, board.h * CELL
+    if w * h * 4 > MAX_RENDER_BYTES:
+        return None
+    pygame.init()
+    return pygame.Surface((w, h))
+
+def _fonts():
+    import pygame
+    from settings import FONT_NAME
+    return (pygame.font.SysFont(FONT_NAME, 16), pygame.font.SysFont(FONT_NAME, 20))
+
+def caseDrawBoard(board):
+    screen = _screenFor(board)
+    if screen is None:
+        return None
+    from engine.renderer import drawBoard
+    fontSmall, fontMono = _fonts()
+    return lambda: drawBoard(screen, board, "triangle", fontSmall, fontMono, SIGHT_RANGE)
+
+def _panelCase(board, compose):
+    screen = _screenFor(board)
+    if screen is None:
+        return None
+    from engine.renderer import drawPanel
+    from engine.logger import ThoughtsLogger
+    fonts = _fonts()
+    logger = ThoughtsLogger()
+    for i in range(6):
+        for p in board.players:
+            logger.append(p.agentId, f"move=UP | why=bench {i} | Δscore=+0", ["a thought", "another thought"])
+    def run():
+        if compose:
+            logger.append("triangle", "move=UP | why=bench | Δscore=+0", ["a thought"])
+        drawPanel(screen, board, "triangle", logger, fonts, 0)
+    return run
+
+def caseDrawPanel(board):
+    return _panelCase(board, compose=False)
+
+def caseDrawPanelCompose(board):
+    return _panelCase(board, compose=True)
+
+CASES = [
+    ("extractObservation", caseObservation),
+    ("extractCompactObservation", caseCompactObservation),
+    ("extractObservation[turn,sight=20]", caseTurnObservation),
+    ("IncrementalObserver[turn,sight=20]", caseTurnObservationIncremental),
+    ("Player.applyMove", caseApplyMove),
+    ("RedNPC.tryMove", caseTryMove),
+    ("npcPhase", caseNpcPhase),
+    ("npcPhase[vectorized]", caseNpcPhaseVectorized),
+    ("Board.snapshot+restore", caseSnapshotRestore),
+    ("TriangleController.decide", caseTriangle),
+    ("PentagonController.decide", casePentagon),
+    ("Simulation.step", caseSimStep),
+    ("Simulation.step[telemetry]", caseSimStepTelemetry),
+    ("drawBoard", caseDrawBoard),
+    ("drawPanel", caseDrawPanel),
+    ("drawPanel[compose]", caseDrawPanelCompose),
+]
+
+def runSuite(profile, minTime, only=None):
+    results = {}
+    for (w, h) in profile["sizes"]:
+        for n in profile["counts"]:
+            if 2 * n > w * h:
+                continue  # not enough room for n greens and n reds
+            for name, setup in CASES:
+                if only and not any(o in name for o in only):
+                    continue
+                key = f"{name}[{w}x{h},n={n}]"
+                fn = setup(makeBoard(w, h, n, n))
+                if fn is None:
+                    print(f"  {key:<52} skipped", file=sys.stderr)
+                    continue
+                stats = summarize(timeit(fn, minTime))
+                results[key] = stats
+                print(f"  {key:<52} {stats['ops_per_sec']:>12.0f} ops/s   p50 {stats['p50_us']:>9.1f} us"
+                      f"   p99 {stats['p99_us']:>9.1f} us", file=sys.stderr)
+    return results
+
+def compare(baseline, current, threshold):
+    """Print per-case speed ratios; return the keys that regressed by more than threshold."""
+    regressions = []
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        ratio = cur["ops_per_sec"] / base["ops_per_sec"]
+        flag = ""
+        if ratio < 1.0 - threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"  {key:<52} {ratio:>6.2f}x{flag}")
+    return regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Time GeomLab engine hot paths.")
+    ap.add_argument("--full", action="store_true", help="board sizes up to 1000x1000 and up to 100k entities")
+    ap.add_argument("--min-time", type=float, default=0.2, help="seconds spent per case")
+    ap.add_argument("--only", action="append", help="run only cases whose name contains this text; repeatable")
+    ap.add_argument("--out", default="bench.json", help="where to save results")
+    ap.add_argument("--compare", help="baseline results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (0.15 = 15%%)")
+    args = ap.parse_args(argv)
+
+    # Load the baseline before anything is written, so --out can never replace it mid-run
+    baseline = None
+    if args.compare:
+        if os.path.realpath(args.out) == os.path.realpath(args.compare):
+            ap.error("--out and --compare must be different files")
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+
+    results = runSuite(FULL if args.full else QUICK, args.min_time, args.only)
+    doc = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "profile": "full" if args.full else "quick",
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(doc, fh, indent=2)
+    print(f"saved {len(results)} results -> {args.out}", file=sys.stderr)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# Cold-start cost of the entry points, measured with `python -X importtime` in fresh interpreters
+#
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --repeat 9 --out startup.json
+#   python -m benchmarks.startup --compare startup.json --threshold 0.25
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, statement, headless): headless entries must not load the UI or the HTTP stack
+ENTRIES = [
+    ("tournament", "import tournament", True),
+    ("engine.simulation", "import engine.simulation", True),
+    ("engine.batch", "import engine.batch", True),
+    ("rectangle controller", "import controllers.rectangle_controller", True),
+    ("main (CLI parse)", "import main", True),
+    ("main (window)", "import main, engine.game", False),
+    ("replay viewer", "import replay", False),
+]
+HEAVY = ("pygame", "requests", "numpy")
+FORBIDDEN_HEADLESS = ("pygame", "requests")
+
+def importTimes(stmt):
+    # One fresh interpreter: ({top-level module: cumulative us}, wall seconds)
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", stmt], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{stmt}' failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.rstrip()] = int(cumulative)
+    return modules, wall
+
+def topLevel(modules):
+    # importtime indents nested imports; top-level ones carry a single space after the bar
+    return {name.strip(): us for name, us in modules.items() if not name.startswith("  ")}
+
+def measure(stmt, repeat, baseline):
+    best = None
+    for _ in range(repeat):
+        modules, wall = importTimes(stmt)
+        top = topLevel(modules)
+        ours = sum(us for name, us in top.items() if name not in baseline)
+        if best is None or ours < best[0]:
+            best = (ours, wall, modules)
+    ours, wall, modules = best
+    loaded = {name.strip() for name in modules}
+    return {
+        "import_ms": ours / 1000.0,
+        "wall_ms": wall * 1000.0,
+        "modules": len(loaded),
+        "heavy": [m for m in HEAVY if m in loaded],
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure import (cold-start) time of headless and GUI entry points.")
+    ap.add_argument("--repeat", type=int, default=5, help="fresh interpreters per entry; the fastest counts")
+    ap.add_argument("--out", help="save results as JSON")
+    ap.add_argument("--compare", help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    args = ap.parse_args(argv)
+
+    # Load the baseline before anything is written, so --out can never replace it mid-run
+    base = None
+    if args.compare:
+        if args.out and os.path.realpath(args.out) == os.path.realpath(args.compare):
+            ap.error("--out and --compare must be different files")
+        with open(args.compare, encoding="utf-8") as fh:
+            base = json.load(fh)["results"]
+
+    # Interpreter start-up alone (site, encodings, ...) is subtracted from every entry
+    baseline = topLevel(importTimes("pass")[0])
+    results = {}
+    failed = []
+    print(f"  {'entry':<24} {'imports':>10} {'wall':>10} {'modules':>8}  heavy", file=sys.stderr)
+    for label, stmt, headless in ENTRIES:
+        res = measure(stmt, args.repeat, baseline)
+        res["headless"] = headless
+        results[label] = res
+        bad = [m for m in res["heavy"] if headless and m in FORBIDDEN_HEADLESS]
+        if bad:
+            failed.append(f"{label} loads {', '.join(bad)}")
+        print(f"  {label:<24} {res['import_ms']:>7.1f} ms {res['wall_ms']:>7.1f} ms {res['modules']:>8}  "
+              f"{', '.join(res['heavy']) or '-'}{'  (should be headless)' if bad else ''}", file=sys.stderr)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"python": sys.version.split()[0], "results": results}, fh, indent=2)
+        print(f"saved {len(results)} results -> {args.out}", file=sys.stderr)
+    if base is not None:
+        for label, res in results.items():
+            if label not in base:
+                continue
+            ratio = res["import_ms"] / max(base[label]["import_ms"], 1e-6)
+            flag = "  REGRESSION" if ratio > 1.0 + args.threshold else ""
+            if flag:
+                failed.append(f"{label} is {ratio:.2f}x slower")
+            print(f"  {label:<24} {ratio:>6.2f}x{flag}", file=sys.stderr)
+    for msg in failed:
+        print(f"FAIL: {msg}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
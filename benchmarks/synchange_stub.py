@@ -0,0 +1,136 @@
+# Local stand-in for the Synchange endpoint: canned decisions with configurable latency and errors
+#
+#   python -m benchmarks.synchange_stub --port 8765 --latency-ms 120 --jitter-ms 60 --error-rate 0.05
+#   (then point a RectangleController at api_url="http://127.0.0.1:8765/")
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from controllers.llm_scheduler import TokenBucket
+
+MOVES = ("UP", "DOWN", "LEFT", "RIGHT", "STAY")
+
+def cannedAnswer(query):
+    # Same query, same answer, so coalesced and cached requests stay comparable
+    digest = hashlib.sha256(query.encode("utf-8")).digest()
+    move = MOVES[digest[0] % len(MOVES)]
+    return json.dumps({"move": move, "why": "stub decision", "thoughts": [f"stub {digest[:4].hex()}"]})
+
+class StubServer:
+    """
+    Threaded HTTP server speaking the Synchange JSON protocol ({"query": ...} -> {"response": ...}).
+    Each request sleeps latency + an exponential tail with mean `jitter`, then fails with HTTP 500
+    at `errorRate`. With `maxRps` set, requests beyond that rate get HTTP 429 right away.
+    """
+    def __init__(self, port=0, latencyMs=100.0, jitterMs=50.0, errorRate=0.0, maxRps=None, seed=1):
+        self.latency = latencyMs / 1000.0
+        self.jitter = jitterMs / 1000.0
+        self.errorRate = errorRate
+        self.limit = TokenBucket(maxRps) if maxRps else None
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "errors": 0, "throttled": 0, "peak_concurrent": 0}
+        self.active = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self.handlerClass())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def handlerClass(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, doc = stub.answer(body)
+                data = json.dumps(doc).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def answer(self, body):
+        with self.lock:
+            self.counts["requests"] += 1
+            if self.limit is not None and not self.limit.try_acquire():
+                self.counts["throttled"] += 1
+                return 429, {"error": "rate limit exceeded"}
+            delay = self.latency + (self.rng.expovariate(1.0 / self.jitter) if self.jitter else 0.0)
+            fail = self.rng.random() < self.errorRate
+            self.active += 1
+            self.counts["peak_concurrent"] = max(self.counts["peak_concurrent"], self.active)
+        try:
+            time.sleep(delay)
+        finally:
+            with self.lock:
+                self.active -= 1
+        if fail:
+            with self.lock:
+                self.counts["errors"] += 1
+            return 500, {"error": "stub failure"}
+        try:
+            query = json.loads(body)["query"]
+        except (ValueError, KeyError):
+            return 400, {"error": "bad request"}
+        return 200, {"response": cannedAnswer(query)}
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), name="synchange-stub",
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve canned Synchange answers locally.")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=100.0)
+    ap.add_argument("--jitter-ms", type=float, default=50.0, help="mean of the exponential latency tail")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    ap.add_argument("--max-rps", type=float, default=None, help="answer HTTP 429 above this request rate")
+    args = ap.parse_args(argv)
+    stub = StubServer(args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.max_rps)
+    print(f"Synchange stub on {stub.url}  (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.httpd.server_close()
+        print(json.dumps(stub.stats()), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
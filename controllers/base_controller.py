@@ -1,29 +1,38 @@
 # Controller base and utilities for path intent
 
 from engine.geometry import manhattan
+from engine.vision import selfPos, visibleCells, GREEN, RED
+from controllers.influence import InfluenceMap
 
 class BaseController:
+    # Set to True to receive a CompactObservation (array-backed, dict built lazily)
+    compactObservation = False
+    # Set to True for CPU-heavy decide() (search); simultaneous rounds may then run it in a process
+    cpuBound = False
+
     # Decide must return:
     # { "move": "UP|DOWN|LEFT|RIGHT|STAY", "why": str, "thoughts": [str, ...] }
     def decide(self, observation):
         raise NotImplementedError
 
+    # Helper: influence map for this observation, shared by every query during the turn
+    def influence(self, obs):
+        cached = getattr(self, "_influence", None)
+        if cached is None or cached[0] is not obs:
+            cached = (obs, InfluenceMap(obs))
+            self._influence = cached
+        return cached[1]
+
     # Helper: find nearest visible green
     def nearestGreen(self, obs):
-        sx = obs["self"]["pos"]["x"]
-        sy = obs["self"]["pos"]["y"]
-        greens = [(v["x"], v["y"]) for v in obs["vision"] if v["t"] == "GREEN"]
+        sx, sy = selfPos(obs)
+        greens = visibleCells(obs, GREEN)
         if not greens:
             return None
-        greens.sort(key=lambda g: manhattan((sx, sy), g))
-        return greens[0]
+        # min() keeps the first of equally near greens, like a stable sort would
+        return min(greens, key=lambda g: manhattan((sx, sy), g))
 
-    # Helper: are we threatened by adjacent red
+    # Helper: are we threatened by adjacent red (a direct walk; no influence map needed)
     def redNearby(self, obs):
-        sx = obs["self"]["pos"]["x"]
-        sy = obs["self"]["pos"]["y"]
-        reds = [(v["x"], v["y"]) for v in obs["vision"] if v["t"] == "RED"]
-        for rx, ry in reds:
-            if manhattan((sx, sy), (rx, ry)) <= 1:
-                return True
-        return False
+        pos = selfPos(obs)
+        return any(manhattan(pos, r) <= 1 for r in visibleCells(obs, RED))
@@ -0,0 +1,90 @@
+# Per-turn influence map: green attraction and red repulsion over the visible window
+
+from engine.geometry import manhattan
+from engine.vision import selfPos, sightOf, visibleCells, GREEN, RED
+
+GREEN_WEIGHT = 1.2
+RED_WEIGHT = 1.0
+NO_RED = 999  # distance reported when no red is visible
+DENSE_AFTER = 32  # distinct cells scored before the whole window is precomputed
+
+class InfluenceMap:
+    """
+    Built once per observation. value() and minRedDistance() walk the visible greens and reds
+    directly and memoize per cell, which is all a one-step controller needs. Once a controller
+    has scored DENSE_AFTER distinct cells (lookahead), both fields are precomputed with NumPy over
+    the square window holding the sight diamond plus one step, and lookups there become O(1).
+    value(pos) = sum(GREEN_WEIGHT / d) over greens - sum(RED_WEIGHT / d) over reds, d = max(1, manhattan)
+    Each cell is summed in vision order either way, so values are bit-identical.
+    """
+    def __init__(self, obs):
+        self.greens = visibleCells(obs, GREEN)
+        self.reds = visibleCells(obs, RED)
+        self.obs = obs
+        self.valueField = None
+        self.redDistField = None
+        self._value = {}
+        self._redDist = {}
+
+    def _buildFields(self):
+        import numpy as np  # only lookahead controllers pay for it
+        sx, sy = selfPos(self.obs)
+        r = sightOf(self.obs) + 1
+        self.x0, self.y0, self.size = sx - r, sy - r, 2 * r + 1
+        xs = np.arange(self.x0, self.x0 + self.size)
+        ys = np.arange(self.y0, self.y0 + self.size)
+
+        def distances(px, py):
+            return np.abs(ys - py)[:, None] + np.abs(xs - px)[None, :]
+
+        gScore = np.zeros((self.size, self.size))
+        for gx, gy in self.greens:
+            gScore += GREEN_WEIGHT / np.maximum(1, distances(gx, gy))
+        rPenalty = np.zeros((self.size, self.size))
+        nearest = np.full((self.size, self.size), NO_RED)
+        for rx, ry in self.reds:
+            d = distances(rx, ry)
+            rPenalty += RED_WEIGHT / np.maximum(1, d)
+            np.minimum(nearest, d, out=nearest)
+        # Flat row-major lists: indexing them returns plain Python floats/ints, faster than array scalars
+        self.valueField = (gScore - rPenalty).ravel().tolist()
+        self.redDistField = nearest.ravel().tolist()
+
+    def _fieldIndex(self, pos):
+        # Index into the precomputed fields (built on first use), or None outside the window
+        if self.valueField is None:
+            self._buildFields()
+        i, j, n = pos[1] - self.y0, pos[0] - self.x0, self.size
+        if 0 <= i < n and 0 <= j < n:
+            return i * n + j
+        return None
+
+    def value(self, pos):
+        v = self._value.get(pos)
+        if v is not None:
+            return v
+        if self.valueField is not None or len(self._value) >= DENSE_AFTER:
+            k = self._fieldIndex(pos)
+            if k is not None:
+                return self.valueField[k]
+        gScore = 0.0
+        rPenalty = 0.0
+        for g in self.greens:
+            gScore += GREEN_WEIGHT / max(1, manhattan(pos, g))
+        for r in self.reds:
+            rPenalty += RED_WEIGHT / max(1, manhattan(pos, r))
+        v = gScore - rPenalty
+        self._value[pos] = v
+        return v
+
+    def minRedDistance(self, pos):
+        d = self._redDist.get(pos)
+        if d is not None:
+            return d
+        if self.valueField is not None or len(self._redDist) >= DENSE_AFTER:
+            k = self._fieldIndex(pos)
+            if k is not None:
+                return self.redDistField[k]
+        d = min((manhattan(pos, r) for r in self.reds), default=NO_RED)
+        self._redDist[pos] = d
+        return d
@@ -0,0 +1,119 @@
+# LLMCache — content-addressed response cache (in-memory LRU + optional SQLite store)
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+def cache_key(model: str, service_name: str, prompt: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, service_name, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+class LLMCache:
+    """
+    Caches LLM answers keyed by sha256(model, service, full prompt).
+    - memory: LRU of up to `max_entries` answers
+    - disk:   optional SQLite file at `path`, trimmed to `max_disk_entries` (least recently used first)
+    - ttl:    seconds an answer stays valid (None = forever)
+    - offline: never hit the network; a miss fails instead (deterministic replays)
+    """
+    TRIM_EVERY = 64  # disk eviction runs once per this many writes
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1024,
+                 max_disk_entries: int = 100_000, ttl: Optional[float] = None,
+                 offline: bool = False):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._mem: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, response TEXT NOT NULL,"
+                " created REAL NOT NULL, used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses(used)")
+            self._db.commit()
+
+    def _fresh(self, created: float, now: float) -> bool:
+        return self.ttl is None or now - created <= self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                if self._fresh(hit[1], now):
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    return hit[0]
+                del self._mem[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if self._fresh(row[1], now):
+                        self._db.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, row[0], row[1])
+                        self.hits += 1
+                        return row[0]
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created, used) VALUES (?, ?, ?, ?)",
+                    (key, response, now, now)
+                )
+                self._puts += 1
+                if self._puts % self.TRIM_EVERY == 1:
+                    self._trim_disk(now)
+                self._db.commit()
+
+    def discard(self, key: str):
+        with self._lock:
+            self._mem.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+
+    def _remember(self, key: str, response: str, created: float):
+        self._mem[key] = (response, created)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _trim_disk(self, now: float):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY used LIMIT ?)",
+                (excess,)
+            )
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
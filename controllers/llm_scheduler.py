@@ -0,0 +1,142 @@
+# LLMScheduler — shared request queue for LLM clients: coalescing, concurrency cap, rate limit
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from settings import LLM_MAX_CONCURRENCY, LLM_RATE_LIMIT, LLM_RATE_BURST
+from controllers.llm_cache import cache_key
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `burst`.
+    acquire() blocks until a token is available; try_acquire() never blocks.
+    """
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0  # total seconds callers spent blocked in acquire()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def acquire(self):
+        started = None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    if started is not None:
+                        self.waited += now - started
+                    return
+                delay = (1.0 - self._tokens) / self.rate
+            if started is None:
+                started = now
+            time.sleep(delay)
+
+class LLMScheduler:
+    """
+    One queue in front of any number of SynchangeLLM clients (one per controller, across games).
+    - coalescing: a prompt identical to one already in flight (same endpoint, access id, model,
+      service and full prompt) shares that request's future instead of sending another
+    - max_concurrency: requests on the wire at once, across all clients (thread-pool transport)
+    - rate / burst: token bucket, in requests per second, taken before each request is sent
+    submit() returns a Future of the answer string; request() blocks on it.
+    """
+    def __init__(self, max_concurrency: int = 8, rate: Optional[float] = None,
+                 burst: Optional[float] = None):
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, str, str], Future] = {}
+        self._latencies = deque(maxlen=1024)
+        self._counters = {"submitted": 0, "coalesced": 0, "sent": 0, "errors": 0, "peak_in_flight": 0}
+        self._active = 0
+
+    def submit(self, llm, prompt: str) -> Future:
+        # Clients on different backends or credentials never share an answer
+        key = (llm.base_url, llm.access_id, cache_key(llm.model, llm.service_name, llm.full_prompt(prompt)))
+        with self._lock:
+            self._counters["submitted"] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                return future
+            future = self._pool.submit(self._send, llm, prompt, time.perf_counter())
+            self._in_flight[key] = future
+        future.add_done_callback(lambda f, key=key: self._forget(key, f))
+        return future
+
+    def request(self, llm, prompt: str) -> str:
+        return self.submit(llm, prompt).result()
+
+    def _forget(self, key: Tuple[str, str, str], future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _send(self, llm, prompt: str, queued: float) -> str:
+        if self.bucket is not None:
+            self.bucket.acquire()
+        with self._lock:
+            self._active += 1
+            self._counters["sent"] += 1
+            if self._active > self._counters["peak_in_flight"]:
+                self._counters["peak_in_flight"] = self._active
+        try:
+            answer = llm.send_request(prompt)
+        finally:
+            with self._lock:
+                self._active -= 1
+        with self._lock:
+            if answer.startswith("Error:"):
+                self._counters["errors"] += 1
+            self._latencies.append(time.perf_counter() - queued)
+        return answer
+
+    def stats(self) -> Dict[str, Any]:
+        """Submitted/coalesced/sent counters, peak concurrency, and queue-to-answer latency (seconds)."""
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counters)
+            out["in_flight"] = len(self._in_flight)
+            lat = sorted(self._latencies)
+        if self.bucket is not None:
+            out["rate_wait_s"] = round(self.bucket.waited, 3)
+        if lat:
+            out["latency_p50"] = lat[len(lat) // 2]
+            out["latency_p99"] = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+            out["latency_max"] = lat[-1]
+        return out
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+_shared: Optional[LLMScheduler] = None
+_shared_lock = threading.Lock()
+
+def shared_scheduler() -> LLMScheduler:
+    """Process-wide scheduler built from settings.py, for controllers created from a match config."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LLMScheduler(LLM_MAX_CONCURRENCY, LLM_RATE_LIMIT, LLM_RATE_BURST)
+        return _shared
@@ -0,0 +1,116 @@
+# Monte-Carlo tree search over own moves on a model of the visible board
+
+import math
+import random
+import time
+from controllers.base_controller import BaseController
+from engine.board import Board
+from engine.entities import Player, RedNPC
+from engine.geometry import DIRS
+from engine.vision import selfPos, boardBounds, visibleCells, GREEN, RED
+from settings import SCORES, RED_MOVE_PROB
+
+MOVES = list(DIRS)
+
+class _Node:
+    __slots__ = ("visits", "total", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.total = 0.0
+        self.children = {}
+
+class MCTSController(BaseController):
+    """
+    UCT search over our own moves. Each decision rebuilds a Board holding only what we can
+    see (greens, reds, ourselves); reds move with the engine's RED_MOVE_PROB rule. Every
+    iteration plays a selection/expansion path plus a random rollout, then rewinds the board
+    with Board.snapshot()/restore() instead of copying it.
+    """
+    compactObservation = True
+    cpuBound = True  # simultaneous rounds may run it in a worker process
+
+    def __init__(self, timeBudgetMs=50, depth=10, exploration=1.2, discount=0.95,
+                 redMoveProb=RED_MOVE_PROB, seed=0):
+        self.timeBudgetMs = timeBudgetMs
+        self.depth = depth
+        self.exploration = exploration
+        self.discount = discount
+        self.redMoveProb = redMoveProb
+        self.rng = random.Random(seed)
+
+    def modelBoard(self, obs):
+        w, h = boardBounds(obs)
+        board = Board(w, h, SCORES)
+        me = Player("self", (0, 0, 0), None)
+        sx, sy = selfPos(obs)
+        board.addPlayer(me, sx, sy)
+        board.greens.update(visibleCells(obs, GREEN))
+        for (rx, ry) in visibleCells(obs, RED):
+            board.addRed(RedNPC(rx, ry))
+        return board, me
+
+    def play(self, board, me, mv):
+        # One own move followed by an NPC phase; returns the score change
+        before = me.score
+        me.applyMove(board, mv)
+        for r in board.reds:
+            r.tryMove(board, self.rng, self.redMoveProb)
+        return me.score - before
+
+    def decide(self, obs):
+        board, me = self.modelBoard(obs)
+        root = _Node()
+        rootSnap = board.snapshot()
+        rng = self.rng
+        started = time.perf_counter()
+        deadline = started + self.timeBudgetMs / 1000.0
+        rollouts = 0
+
+        while rollouts < len(MOVES) or time.perf_counter() < deadline:
+            node = root
+            path = [root]
+            reward = 0.0
+            weight = 1.0
+            depth = 0
+
+            # Selection: descend through fully expanded nodes by UCT
+            while len(node.children) == len(MOVES) and depth < self.depth:
+                logN = math.log(node.visits)
+                mv, node = max(node.children.items(),
+                               key=lambda kv: kv[1].total / kv[1].visits
+                               + self.exploration * math.sqrt(logN / kv[1].visits))
+                reward += weight * self.play(board, me, mv)
+                weight *= self.discount
+                depth += 1
+                path.append(node)
+
+            # Expansion: try one unexplored move
+            if depth < self.depth:
+                mv = rng.choice([m for m in MOVES if m not in node.children])
+                child = _Node()
+                node.children[mv] = child
+                reward += weight * self.play(board, me, mv)
+                weight *= self.discount
+                depth += 1
+                path.append(child)
+
+            # Rollout: random moves to the horizon
+            while depth < self.depth:
+                reward += weight * self.play(board, me, rng.choice(MOVES))
+                weight *= self.discount
+                depth += 1
+
+            for n in path:
+                n.visits += 1
+                n.total += reward
+            board.restore(rootSnap)
+            rollouts += 1
+
+        elapsed = time.perf_counter() - started
+        ranked = sorted(root.children.items(), key=lambda kv: -kv[1].visits)
+        best, bestNode = ranked[0]
+        thoughts = [f"rollouts={rollouts} ({rollouts / max(elapsed, 1e-9):,.0f}/s, depth {self.depth})"]
+        thoughts += [f"mv={mv} visits={n.visits} value={n.total / n.visits:.2f}" for mv, n in ranked[:3]]
+        why = f"MCTS best of {rollouts} rollouts, value {bestNode.total / bestNode.visits:.2f}"
+        return {"move": best, "why": why, "thoughts": thoughts}
@@ -1,12 +1,13 @@
 # Value-based heuristic: score = greensNear - redsNear
 
 from controllers.base_controller import BaseController
-from engine.geometry import manhattan
+from engine.vision import selfPos
 
 class PentagonController(BaseController):
+    compactObservation = True
+
     def decide(self, obs):
-        sx = obs["self"]["pos"]["x"]
-        sy = obs["self"]["pos"]["y"]
+        sx, sy = selfPos(obs)
         thoughts = []
 
         moves = ["UP", "DOWN", "LEFT", "RIGHT", "STAY"]
@@ -30,14 +31,4 @@ class PentagonController(BaseController):
         return (x, y)
 
     def localValue(self, obs, pos):
-        greens = [(v["x"], v["y"]) for v in obs["vision"] if v["t"] == "GREEN"]
-        reds = [(v["x"], v["y"]) for v in obs["vision"] if v["t"] == "RED"]
-        gScore = 0.0
-        rPenalty = 0.0
-        for gx, gy in greens:
-            d = max(1, manhattan(pos, (gx, gy)))
-            gScore += 1.2 / d
-        for rx, ry in reds:
-            d = max(1, manhattan(pos, (rx, ry)))
-            rPenalty += 1.0 / d
-        return gScore - rPenalty
+        return self.influence(obs).value(pos)
@@ -2,36 +2,105 @@
 
 import json
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import List, Dict, Any, Optional, Tuple
 from controllers.base_controller import BaseController
 from controllers.synchange_llm import SynchangeLLM
+from controllers.llm_cache import LLMCache
+from controllers.llm_scheduler import LLMScheduler, shared_scheduler
+from engine.vision import visibleCells, visiblePlayers, GREEN, RED
 
 VALID_MOVES = {"UP","DOWN","LEFT","RIGHT","STAY"}
 
-def extract_json(text: str) -> Optional[dict]:
-    """Extract the first valid JSON object from a string (supports code blocks)."""
-    # Try fenced code block ```json … ```
-    m = re.search(r"```json\s*(\{.*?\})\s*```", text, flags=re.DOTALL|re.IGNORECASE)
-    if m:
-        try:
-            return json.loads(m.group(1))
-        except Exception:
-            pass
-    # Fallback: first {...} blob
-    m = re.search(r"(\{.*\})", text, flags=re.DOTALL)
-    if m:
-        blob = m.group(1)
-        # balance braces conservatively
+_decoder = json.JSONDecoder()
+# A JSON string; raw newlines are not allowed inside one
+_STRING = r'"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+# Where an object can start: '{', optional whitespace, then a key or '}' ("{value 3}" in prose never matches)
+_object_start = re.compile(r'\{\s*["}]')
+# Inside an object: strings are skipped whole; a lone '"' is one left open at the end of its line.
+# A '{' that cannot start an object (prose, broken JSON) is matched but has no group.
+_token = re.compile(_STRING + r'|(?P<quote>")|(?P<open>\{(?=\s*["}]))|(?P<close>\})|\{')
+
+def _span_groups(text: str, start: int = 0):
+    """
+    One pass over `text` yielding, per top-level candidate, the balanced {...} spans (start, end)
+    found in it, sorted by start (outermost first). Strings and escapes are tracked so braces
+    inside them do not count; a string still open at the end of its line (JSON forbids raw
+    newlines in strings) abandons the objects around it, and the spans that did close inside
+    them are still yielded. A stray quote inside a broken object can hide a later object on the
+    same line; the scan is never restarted, which keeps it linear.
+    """
+    pos = start
+    while True:
+        m = _object_start.search(text, pos)
+        if m is None:
+            return
+        stack = [m.start()]
+        closed = []
+        pos = len(text)
+        for t in _token.finditer(text, m.start() + 1):
+            kind = t.lastgroup
+            if kind == "close":
+                closed.append((stack.pop(), t.end()))
+                if not stack:
+                    pos = t.end()
+                    break
+            elif kind == "open":
+                stack.append(t.start())
+            elif kind == "quote":
+                nl = text.find("\n", t.start())
+                pos = len(text) if nl < 0 else nl + 1
+                break
+        if closed:
+            closed.sort()
+            yield closed
+
+def _objects(text: str, start: int = 0, key: Optional[str] = None):
+    # Well-formed objects decode in place at C speed. A failed in-place decode costs O(position)
+    # (the error's line and column), so the first one hands the rest of the text to the span
+    # scanner, where only spans that close are decoded, each from its own slice.
+    # With `key`, once an object has been found, spans not containing '"key"' are not decoded.
+    decode = _decoder.raw_decode
+    m = _object_start.search(text, start)
+    while m is not None:
         try:
-            return json.loads(blob)
-        except Exception:
-            # last resort: strip trailing explanations
+            obj, end = decode(text, m.start())
+        except ValueError:
+            break
+        yield obj
+        m = _object_start.search(text, end)
+    if m is None:
+        return
+    needle = None
+    for group in _span_groups(text, m.start()):
+        resume = 0
+        for s, e in group:
+            if s < resume or (needle is not None and text.find(needle, s, e) < 0):
+                continue
             try:
-                end = blob.rfind("}")
-                return json.loads(blob[:end+1])
-            except Exception:
-                return None
-    return None
+                obj = decode(text[s:e])[0]
+            except ValueError:
+                continue
+            yield obj
+            resume = e
+            if key is not None:
+                needle = f'"{key}"'
+
+def iter_json_objects(text: str, start: int = 0):
+    """Yield the JSON objects embedded in `text`, left to right, in one linear pass."""
+    return _objects(text, start)
+
+def extract_json(text: str) -> Optional[dict]:
+    """First JSON object in a response that has a "move" key, else the first object at all."""
+    first = None
+    for obj in _objects(text, key="move"):
+        if "move" in obj:
+            return obj
+        if first is None:
+            first = obj
+    return first
 
 def is_valid_decision(d: dict) -> Tuple[bool, str]:
     if not isinstance(d, dict):
@@ -46,40 +115,78 @@ def is_valid_decision(d: dict) -> Tuple[bool, str]:
         return (False, "Field 'thoughts' must be a list of strings.")
     return (True, "")
 
+def is_decision_answer(text: str) -> bool:
+    """True when an LLM answer parses into a valid decision (what the cache may keep)."""
+    parsed = extract_json(text)
+    return parsed is not None and is_valid_decision(parsed)[0]
+
 class RectangleController(BaseController):
     """
     Synchange LLM-driven controller.
     Keeps an internal short history of (tick, move, deltaScore, summary).
+    Pass a shared `llm` client to let several controllers reuse one connection pool,
+    and an LLMCache to reuse (or, offline, replay) answers to identical prompts; only answers that
+    parse into a valid decision are cached, so a re-ask after a bad answer goes back to the LLM.
+    With a `scheduler` (or use_shared_scheduler=True for the process-wide one) requests go through
+    an LLMScheduler shared with other controllers instead of straight to the client.
+    prefetch(obs) starts the request for a predicted observation in the background; decide()
+    reuses that answer when its prompt comes out identical, and re-asks otherwise. It waits at most
+    `prefetch_wait` seconds (default: the client's timeout) for a matching prefetch before re-asking.
     """
     def __init__(self, model: str = "meta_llama70b", access_id: str = "trial_version",
                  api_url: str = "https://synchange.com/sync.php", sender: str = "GeomLab1",
                  service_name: str = "meta_llama70b",
                  api_retries: int = 3, timeout: int = 10,
-                 agent_retries: int = 3, history_max: int = 30):
-        self.llm = SynchangeLLM(
+                 agent_retries: int = 3, history_max: int = 30,
+                 pool_size: int = 4, backoff: float = 0.5,
+                 llm: Optional[SynchangeLLM] = None, cache: Optional[LLMCache] = None,
+                 scheduler: Optional[LLMScheduler] = None, use_shared_scheduler: bool = False,
+                 prefetch_wait: Optional[float] = None):
+        self.llm = llm or SynchangeLLM(
             model=model, api_url=api_url, sender=sender,
             retries=api_retries, timeout=timeout,
-            access_id=access_id, server_name=service_name
+            access_id=access_id, server_name=service_name,
+            pool_size=pool_size, backoff=backoff, cache=cache, accept=is_decision_answer
         )
+        if self.llm.accept is None:
+            self.llm.accept = is_decision_answer
+        self.scheduler = scheduler or (shared_scheduler() if use_shared_scheduler else None)
         self.history: List[Dict[str, Any]] = []
         self.agent_retries = agent_retries
         self.history_max = history_max
+        self.invalid_answers = 0
+        self.fallbacks = 0
+        # Speculative request: (prompt, future -> (answer, finished_at), started_at)
+        self._prefetch = None
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_pool: Optional[ThreadPoolExecutor] = None
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+        self.prefetch_saved = 0.0  # seconds of LLM latency already elapsed when decide() started
+        self.prefetch_late = 0     # matching prefetches given up on: still queued, or past prefetch_wait
+        self.prefetch_wait = prefetch_wait if prefetch_wait is not None else self.llm.timeout
 
     def decide(self, obs: Dict[str, Any]) -> Dict[str, Any]:
         prompt = self.build_prompt(obs)
         parsed: Optional[dict] = None
         reasons = []
 
+        prefetched = self._take_prefetch(prompt)
         for attempt in range(1, self.agent_retries + 1):
-            raw = self.llm.send_request(prompt)
+            if attempt == 1 and prefetched is not None:
+                raw = prefetched
+            else:
+                raw = self._ask(prompt)
             parsed = extract_json(raw) if isinstance(raw, str) else None
             if not parsed:
                 reasons.append(f"Attempt {attempt}: could not parse JSON.")
+                self.invalid_answers += 1
                 continue
             ok, msg = is_valid_decision(parsed)
             if ok:
                 break
             reasons.append(f"Attempt {attempt}: {msg}")
+            self.invalid_answers += 1
             # Add corrective hint for next try
             prompt += (
                 f"\n\nPrevious attempt had an issue: {msg}. "
@@ -89,11 +196,71 @@ class RectangleController(BaseController):
 
         if not parsed or not is_valid_decision(parsed)[0]:
             # Safe fallback
+            self.fallbacks += 1
             fallback = {"move":"STAY","why":"LLM failed to produce valid decision","thoughts":reasons[:3]}
             return fallback
 
         return parsed
 
+    def _ask(self, prompt: str) -> str:
+        if self.scheduler is not None:
+            return self.scheduler.request(self.llm, prompt)
+        return self.llm.send_request(prompt)
+
+    # ---------- Speculative prefetch ----------
+    def prefetch(self, obs: Dict[str, Any]):
+        """Start the request for `obs` (the observation we expect at our turn) in the background."""
+        prompt = self.build_prompt(obs)
+        with self._prefetch_lock:
+            if self._prefetch is not None and self._prefetch[0] == prompt:
+                return
+            if self._prefetch is not None:
+                # Drop the superseded request if it has not started; once running it finishes unread
+                self._prefetch[1].cancel()
+            if self._prefetch_pool is None:
+                self._prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+            future = self._prefetch_pool.submit(self._timed_request, prompt)
+            self._prefetch = (prompt, future, time.perf_counter())
+
+    def _timed_request(self, prompt: str) -> Tuple[str, float]:
+        answer = self._ask(prompt)
+        return answer, time.perf_counter()
+
+    def _take_prefetch(self, prompt: str) -> Optional[str]:
+        with self._prefetch_lock:
+            pending, self._prefetch = self._prefetch, None
+        if pending is None:
+            return None
+        predicted, future, started = pending
+        if predicted != prompt:
+            future.cancel()
+            self.prefetch_misses += 1
+            return None
+        if future.cancel():
+            # Still queued behind a stale request (the pool has one worker): asking now is no slower
+            self.prefetch_late += 1
+            return None
+        asked_at = time.perf_counter()
+        try:
+            answer, finished = future.result(timeout=self.prefetch_wait)
+        except FutureTimeout:
+            self.prefetch_late += 1
+            return None
+        self.prefetch_hits += 1
+        self.prefetch_saved += max(0.0, min(asked_at, finished) - started)
+        return answer
+
+    def stats(self) -> Dict[str, Any]:
+        """LLM client counters (requests, retries, ...), answers we had to reject, prefetch results."""
+        out = self.llm.stats()
+        out["invalid_answers"] = self.invalid_answers
+        out["fallbacks"] = self.fallbacks
+        out["prefetch_hits"] = self.prefetch_hits
+        out["prefetch_misses"] = self.prefetch_misses
+        out["prefetch_late"] = self.prefetch_late
+        out["prefetch_saved_s"] = round(self.prefetch_saved, 3)
+        return out
+
     def postOutcome(self, tick: int, decision: Dict[str, Any], delta_score: int):
         """Engine calls this after applying our move so we can learn/log."""
         entry = {
@@ -137,10 +304,9 @@ class RectangleController(BaseController):
 
     def summarize_obs(self, obs: Dict[str, Any]) -> str:
         me = obs["self"]
-        vis = obs["vision"]
-        greens = [(v["x"], v["y"]) for v in vis if v["t"] == "GREEN"]
-        reds   = [(v["x"], v["y"]) for v in vis if v["t"] == "RED"]
-        players= [(v.get("id"), v["x"], v["y"]) for v in vis if v["t"] == "PLAYER" and v.get("id")!="rectangle"]
+        greens = visibleCells(obs, GREEN)
+        reds   = visibleCells(obs, RED)
+        players= [p for p in visiblePlayers(obs) if p[0] != me["id"]]
         return (
             f"tick={obs['tick']}, self=({me['pos']['x']},{me['pos']['y']}), "
             f"score={me['score']}, greens={greens[:6]}, reds={reds[:6]}, "
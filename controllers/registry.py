@@ -0,0 +1,26 @@
+# Controller registry — resolve controllers by name, importing them only when used
+
+import importlib
+
+CONTROLLERS = {
+    "triangle":  "controllers.triangle_controller:TriangleController",    # greedy heuristic
+    "pentagon":  "controllers.pentagon_controller:PentagonController",    # value heuristic
+    "rectangle": "controllers.rectangle_controller:RectangleController",  # Synchange LLM
+    "human":     "controllers.human_controller:HumanController",          # keyboard
+    "mcts":      "controllers.mcts_controller:MCTSController",            # tree search
+}
+
+ALIASES = {
+    "llm": "rectangle",
+}
+
+def resolve(name: str):
+    """Return the controller class registered under `name`."""
+    key = ALIASES.get(name, name)
+    if key not in CONTROLLERS:
+        raise KeyError(f"Unknown controller '{name}'. Known: {', '.join(sorted(CONTROLLERS))}")
+    moduleName, className = CONTROLLERS[key].split(":")
+    return getattr(importlib.import_module(moduleName), className)
+
+def create(name: str, **kwargs):
+    return resolve(name)(**kwargs)
@@ -1,18 +1,39 @@
-from typing import Dict, Any
-import requests
+from typing import Callable, Dict, Any, Optional, TYPE_CHECKING
+from collections import deque
 import json
-import urllib.request
-import urllib.error
+import threading
+import time
+from controllers.llm_cache import LLMCache, cache_key
+
+if TYPE_CHECKING:
+    import requests
+
+def make_session(pool_size: int = 4) -> "requests.Session":
+    """Keep-alive session whose connection pool can be shared by several clients."""
+    # requests is imported on first use, so loading the LLM stack costs nothing until a client exists
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 class SynchangeLLM():
-    def __init__(self, 
-                model: str, 
+    def __init__(self,
+                model: str,
                 api_url: str = "", #" https://a.com/b.php",
                 sender: str = "", #"c",
                 retries: int = 3,
                 timeout: int = 10,
                 access_id: str="", #"d",
-                server_name :str = "meta_llama70b"):
+                server_name :str = "meta_llama70b",
+                pool_size: int = 4,
+                backoff: float = 0.5,
+                backoff_max: float = 8.0,
+                session: Optional["requests.Session"] = None,
+                cache: Optional[LLMCache] = None,
+                accept: Optional[Callable[[str], bool]] = None):
         self.model = model
         self.base_url = api_url
         self.sender = sender
@@ -23,57 +44,127 @@ class SynchangeLLM():
         self.base_prompt = (
             "You are an LLM agent, a prototype AI agent answering to prompts requested by users."
         )
+        # Pooled keep-alive connections; pass `session` to share sockets with other clients
+        self.session = session or make_session(pool_size)
+        # Exponential backoff between attempts: backoff, 2*backoff, ... capped at backoff_max
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        # Optional response cache in front of send_request; only answers that pass `accept`
+        # (e.g. parse into a valid decision) are stored, so a retry never gets a bad answer back
+        self.cache = cache
+        self.accept = accept
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=256)
+        self._counters = {"requests": 0, "attempts": 0, "retries": 0, "failures": 0, "cache_hits": 0}
+
+    def _post(self, payload: Dict[str, Any]) -> "requests.Response":
+        started = time.perf_counter()
+        try:
+            return self.session.post(
+                self.base_url,
+                headers={"Content-Type": "application/json"},
+                data=json.dumps(payload),
+                timeout=self.timeout
+            )
+        finally:
+            with self._stats_lock:
+                self._counters["attempts"] += 1
+                self._latencies.append(time.perf_counter() - started)
+
+    def _cacheable(self, answer: str) -> bool:
+        return bool(answer) and (self.accept is None or self.accept(answer))
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self._counters[key] += n
+
+    def stats(self) -> Dict[str, Any]:
+        """Request/attempt/retry/failure counters plus recent per-attempt latency (seconds)."""
+        with self._stats_lock:
+            out: Dict[str, Any] = dict(self._counters)
+            lat = sorted(self._latencies)
+        if lat:
+            out["latency_last"] = self._latencies[-1]
+            out["latency_p50"] = lat[len(lat) // 2]
+            out["latency_max"] = lat[-1]
+        return out
 
     def chat(self, prompt: str) -> Dict[str, Any]:
+        import requests
         payload = {
             "access_id":    self.access_id,
             "service_name": self.service_name,
             "query":        prompt
         }
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            self.base_url,
-            data=data,
-            headers={"Content-Type": "application/json"}
-        )
+        self._count("requests")
+        # Transport and decoding are caught apart: MissingSchema, InvalidURL, ... are ValueErrors,
+        # and requests' JSONDecodeError is a RequestException
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                resp_text = resp.read().decode("utf-8")
-            data = json.loads(resp_text)
-            if "error" in data:
-                return {"response": f"Error: {data['error']}"}
-            return data
-        except urllib.error.URLError as e:
+            response = self._post(payload)
+        except requests.RequestException as e:
+            self._count("failures")
             return {"response": f"Error: {e}"}
-        except json.JSONDecodeError:
+        if response.status_code != 200:
+            self._count("failures")
+            return {"response": f"Error: HTTP {response.status_code}: {response.text.strip()}"}
+        try:
+            data = response.json()
+        except ValueError:
+            self._count("failures")
             return {"response": "Error: Invalid JSON in response."}
+        if "error" in data:
+            self._count("failures")
+            return {"response": f"Error: {data['error']}"}
+        return data
 
-    def send_request(self, prompt: str) -> str:
-        full_prompt = (
+    def full_prompt(self, prompt: str) -> str:
+        """The query text send_request() actually sends for `prompt`."""
+        return (
             f"{self.base_prompt}\n\n"
             f"Input (from {self.sender}): {prompt}\n\n"
             "Provide only a concise final answer that directly addresses the query."
         )
+
+    def send_request(self, prompt: str) -> str:
+        full_prompt = self.full_prompt(prompt)
         payload = {
             "access_id": self.access_id,
             "service_name": self.service_name,
             "query": full_prompt
         }
+        self._count("requests")
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.model, self.service_name, full_prompt)
+            cached = self.cache.get(key)
+            if cached is not None and self._cacheable(cached):
+                self._count("cache_hits")
+                return cached
+            if cached is not None:
+                self.cache.discard(key)  # stored before `accept` was set, or by an older version
+            if self.cache.offline:
+                self._count("failures")
+                return "Error: offline cache miss"
         for attempt in range(1, self.retries + 1):
+            if attempt > 1:
+                self._count("retries")
+                time.sleep(min(self.backoff * 2 ** (attempt - 2), self.backoff_max))
             try:
-                response = requests.post(
-                    self.base_url,
-                    headers={"Content-Type": "application/json"},
-                    data=json.dumps(payload),
-                    timeout=self.timeout
-                )
+                response = self._post(payload)
                 if response.status_code == 200:
                     data = response.json()
-                    return data.get("response", "").strip()
+                    if "error" in data:
+                        print(f"[Attempt {attempt}] Error: {data['error']}")
+                        continue
+                    answer = data.get("response", "").strip()
+                    if key is not None and self._cacheable(answer):
+                        self.cache.put(key, answer)
+                    return answer
                 else:
                     print(f"[Attempt {attempt}] HTTP {response.status_code}: {response.text.strip()}")
             except Exception as e:
                 print(f"[Attempt {attempt}] Exception: {e}")
+        self._count("failures")
         return "Error: API call failed after multiple attempts"
 
     def test_connection(self)-> bool:
@@ -82,12 +173,7 @@ class SynchangeLLM():
             "service_name": self.service_name,
             "query":        "Test the connection, return True or False"
         }
-        response = requests.post(
-            self.base_url,
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload),
-            timeout=self.timeout
-            )
+        response = self._post(payload)
         if response.status_code == 200:
             print(f"SynChangeLLM LLM backend connection is successful for model: {self.model}!\n")
             return True
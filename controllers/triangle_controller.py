@@ -2,11 +2,13 @@
 
 from controllers.base_controller import BaseController
 from engine.geometry import manhattan
+from engine.vision import selfPos
 
 class TriangleController(BaseController):
+    compactObservation = True
+
     def decide(self, obs):
-        sx = obs["self"]["pos"]["x"]
-        sy = obs["self"]["pos"]["y"]
+        sx, sy = selfPos(obs)
 
         target = self.nearestGreen(obs)
         thoughts = []
@@ -32,14 +34,9 @@ class TriangleController(BaseController):
             return "DOWN" if ty > sy else "UP"
 
     def evasiveMove(self, obs):
-        sx = obs["self"]["pos"]["x"]
-        sy = obs["self"]["pos"]["y"]
-        redCells = {(v["x"], v["y"]) for v in obs["vision"] if v["t"] == "RED"}
+        sx, sy = selfPos(obs)
+        field = self.influence(obs)
         candidates = [("UP", (sx, sy - 1)), ("DOWN", (sx, sy + 1)), ("LEFT", (sx - 1, sy)), ("RIGHT", (sx + 1, sy)), ("STAY", (sx, sy))]
         # pick farthest from any red
-        def minDistToRed(pos):
-            if not redCells:
-                return 999
-            return min(manhattan(pos, r) for r in redCells)
-        candidates.sort(key=lambda c: -minDistToRed(c[1]))
+        candidates.sort(key=lambda c: -field.minRedDistance(c[1]))
         return candidates[0][0]
@@ -0,0 +1,162 @@
+# Vectorized batch of independent boards (NumPy) following the scalar engine's rules
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from settings import GRID_W, GRID_H, NUM_GREENS, NUM_REDS, RED_MOVE_PROB, MAX_ROUNDS, SIGHT_RANGE
+from engine.entities import Player
+from engine.simulation import setupBoard, SEATS
+from engine.vision import TILE_EMPTY, TILE_GREEN, TILE_RED, TILE_PLAYER, TILE_HIDDEN
+
+# Move codes index MOVES; same deltas as geometry.DIRS
+MOVES = ["UP", "DOWN", "LEFT", "RIGHT", "STAY"]
+MOVE_DX = np.array([0, 0, -1, 1, 0], dtype=np.int32)
+MOVE_DY = np.array([-1, 1, 0, 0, 0], dtype=np.int32)
+
+# Red step candidates, in RedNPC.tryMove's order
+RED_DX = np.array([0, 0, 1, -1, 0], dtype=np.int32)
+RED_DY = np.array([1, -1, 0, 0, 0], dtype=np.int32)
+
+class BatchEnv:
+    """
+    N boards of equal size stepped in lockstep. Turn order, pickups, hazards, red movement
+    (RED_MOVE_PROB per red per round) and the sight-limited view match Simulation, but the
+    red RNG is NumPy's, so red paths differ from a scalar game with the same seed.
+    Boards that end (no greens left or maxRounds reached) are frozen.
+    """
+    def __init__(self, boards, redSeed=0, moveProb=RED_MOVE_PROB, maxRounds=MAX_ROUNDS, sightRange=SIGHT_RANGE):
+        self.n = len(boards)
+        self.w, self.h = boards[0].w, boards[0].h
+        self.numPlayers = len(boards[0].players)
+        self.moveProb = moveProb
+        self.maxRounds = maxRounds
+        self.sightRange = sightRange
+        self.scoreGreen = boards[0].scoreValues["GREEN"]
+        self.scoreRed = boards[0].scoreValues["RED"]
+        self.rng = np.random.default_rng(redSeed)
+        self.boardIdx = np.arange(self.n)
+
+        P = self.numPlayers
+        R = max(len(b.reds) for b in boards)
+        r = sightRange
+        self.px = np.zeros((self.n, P), dtype=np.int32)
+        self.py = np.zeros((self.n, P), dtype=np.int32)
+        self.score = np.zeros((self.n, P), dtype=np.int32)
+        # Board layers live inside an r-cell border so a sight window is one slice away;
+        # self.greens / self.redCount are (N, H, W) views of the interior
+        padded = (self.n, self.h + 2 * r, self.w + 2 * r)
+        self.greensPad = np.zeros(padded, dtype=bool)
+        self.redPad = np.zeros(padded, dtype=np.int16)
+        self.greens = self.greensPad[:, r:r + self.h, r:r + self.w]
+        self.redCount = self.redPad[:, r:r + self.h, r:r + self.w]
+        self.offBoardPad = np.ones(padded[1:], dtype=bool)
+        self.offBoardPad[r:r + self.h, r:r + self.w] = False
+        self.rx = np.zeros((self.n, R), dtype=np.int32)
+        self.ry = np.zeros((self.n, R), dtype=np.int32)
+        self.redAlive = np.zeros((self.n, R), dtype=bool)  # reds are padded to the largest count
+        for i, b in enumerate(boards):
+            if b.w != self.w or b.h != self.h or len(b.players) != P:
+                raise ValueError("All boards in a batch need the same size and player count")
+            for j, p in enumerate(b.players):
+                self.px[i, j], self.py[i, j], self.score[i, j] = p.x, p.y, p.score
+            for (gx, gy) in b.greens:
+                self.greens[i, gy, gx] = True
+            for k, red in enumerate(b.reds):
+                self.rx[i, k], self.ry[i, k] = red.x, red.y
+                self.redAlive[i, k] = True
+        self._countReds()
+
+        self.remaining = self.greens.sum(axis=(1, 2)).astype(np.int32)
+        self.ticks = np.zeros(self.n, dtype=np.int32)
+        self.activeIdx = 0
+        self.lastRedDirs = None  # (N, R) red step codes of the last NPC phase, -1 = stayed put
+
+        # Sight windows (S x S, S = 2r+1): window (y, x) of a padded layer is centred on board cell (x, y)
+        side = 2 * r + 1
+        self.greenWin = sliding_window_view(self.greensPad, (side, side), axis=(1, 2))
+        self.redWin = sliding_window_view(self.redPad, (side, side), axis=(1, 2))
+        self.offBoardWin = sliding_window_view(self.offBoardPad, (side, side))
+        offs = np.arange(-r, r + 1)
+        self.outsideDiamond = (np.abs(offs)[:, None] + np.abs(offs)[None, :]) > r
+
+    @classmethod
+    def fromSeeds(cls, seeds, w=GRID_W, h=GRID_H, numGreens=NUM_GREENS, numReds=NUM_REDS, **kwargs):
+        # Initial states identical to Simulation(seed=...) for each seed
+        boards = []
+        for seed in seeds:
+            players = [Player(agentId, color, None) for agentId, color in SEATS]
+            boards.append(setupBoard(players, seed, w, h, numGreens, numReds))
+        return cls(boards, **kwargs)
+
+    def _countReds(self):
+        self.redCount[...] = 0
+        b = np.broadcast_to(self.boardIdx[:, None], self.rx.shape)
+        alive = self.redAlive
+        np.add.at(self.redCount, (b[alive], self.ry[alive], self.rx[alive]), 1)
+
+    def live(self):
+        return (self.remaining > 0) & (self.ticks < self.maxRounds)
+
+    def step(self, moves):
+        """Apply one move code per board for the active seat; returns the score deltas."""
+        moves = np.asarray(moves, dtype=np.int32)
+        live = self.live()
+        i = self.activeIdx
+        b = self.boardIdx
+
+        nx = np.clip(self.px[:, i] + MOVE_DX[moves], 0, self.w - 1)
+        ny = np.clip(self.py[:, i] + MOVE_DY[moves], 0, self.h - 1)
+        nx = np.where(live, nx, self.px[:, i])
+        ny = np.where(live, ny, self.py[:, i])
+        self.px[:, i], self.py[:, i] = nx, ny
+
+        got = self.greens[b, ny, nx] & live
+        self.greens[b[got], ny[got], nx[got]] = False
+        self.remaining -= got
+        hit = (self.redCount[b, ny, nx] > 0) & live
+        delta = got * self.scoreGreen + hit * self.scoreRed
+        self.score[:, i] += delta
+
+        self.activeIdx = (i + 1) % self.numPlayers
+        if self.activeIdx == 0:
+            self.npcPhase(live)
+            self.ticks += live
+        return delta
+
+    def npcPhase(self, live):
+        shape = self.rx.shape
+        moving = (self.rng.random(shape) <= self.moveProb) & self.redAlive & live[:, None]
+        dirs = self.rng.integers(0, 5, size=shape)
+        nx = np.clip(self.rx + RED_DX[dirs] * moving, 0, self.w - 1)
+        ny = np.clip(self.ry + RED_DY[dirs] * moving, 0, self.h - 1)
+        # Patch the red counts only where a red actually changed cell
+        moved = (nx != self.rx) | (ny != self.ry)
+        b = np.broadcast_to(self.boardIdx[:, None], shape)[moved]
+        np.subtract.at(self.redCount, (b, self.ry[moved], self.rx[moved]), 1)
+        np.add.at(self.redCount, (b, ny[moved], nx[moved]), 1)
+        self.rx, self.ry = nx, ny
+        self.lastRedDirs = np.where(moving, dirs, -1)
+
+    def observe(self):
+        """Sight-limited view of each board's active player as (N, S, S) uint8 tile codes."""
+        i = self.activeIdx
+        r = self.sightRange
+        b = self.boardIdx
+        cx, cy = self.px[:, i], self.py[:, i]
+
+        # Priority: players, reds, greens (as in vision.classify)
+        tiles = np.where(self.greenWin[b, cy, cx], TILE_GREEN, TILE_EMPTY).astype(np.uint8)
+        tiles[self.redWin[b, cy, cx] > 0] = TILE_RED
+        for j in range(self.numPlayers):
+            dx = self.px[:, j] - cx
+            dy = self.py[:, j] - cy
+            seen = (np.abs(dx) <= r) & (np.abs(dy) <= r)
+            tiles[b[seen], dy[seen] + r, dx[seen] + r] = TILE_PLAYER
+        tiles[self.offBoardWin[cy, cx]] = TILE_HIDDEN
+        tiles[:, self.outsideDiamond] = TILE_HIDDEN
+        return {
+            "window": tiles,
+            "pos": np.stack([self.px[:, i], self.py[:, i]], axis=1),
+            "score": self.score[:, i].copy(),
+            "ticks": self.ticks.copy(),
+            "remainingGreens": self.remaining.copy(),
+        }
@@ -1,36 +1,264 @@
 # Board state and random spawning
 
 import random
-from engine.entities import Player, RedNPC
+from engine.entities import Player, RedNPC, Reds
+
+# Candidate red steps, in the order RedNPC.tryMove has always shuffled them
+RED_STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0), (0, 0))
 
 class Board:
-    def __init__(self, w, h, scoreValues):
+    def __init__(self, w, h, scoreValues, seed=42):
         self.w = w
         self.h = h
         self.scoreValues = scoreValues
         self.players = []
         self.greens = set()
-        self.reds = []
-        self.rng = random.Random(42)
+        self.reds = Reds()
+        self.rng = random.Random(seed)
+
+        # Occupancy index: cell -> players standing there (in turn order) / number of reds
+        self.playerCells = {}
+        self.redCells = {}
+
+        # Cells whose occupants changed since the last popDirty(); None = not tracked
+        self.dirtyCells = None
+
+        # Scratch list for the seeded NPC phase's shuffle (no allocation per red)
+        self._steps = list(RED_STEPS)
+
+        # Undo journal of red moves (red index, old x, old y) and green pickups (None, x, y),
+        # kept while snapshots are in use
+        self.journal = None
+
+        # Change listeners: fn(x, y) after the occupants of a cell change (see IncrementalObserver)
+        self.listeners = []
 
     def addPlayer(self, player, x, y):
-        player.x, player.y = x, y
+        player.slot = len(self.players)
         self.players.append(player)
+        player.x, player.y = x, y
+        self._placePlayer(player)
+        for fn in self.listeners:
+            fn(x, y)
 
     def spawnGreens(self, n):
         placed = 0
         while placed < n:
             x = self.rng.randrange(self.w)
             y = self.rng.randrange(self.h)
-            if (x, y) not in self.greens and not any(p.x == x and p.y == y for p in self.players):
+            if (x, y) not in self.greens and (x, y) not in self.playerCells:
                 self.greens.add((x, y))
                 placed += 1
+                for fn in self.listeners:
+                    fn(x, y)
 
     def spawnReds(self, n):
         for _ in range(n):
             x = self.rng.randrange(self.w)
             y = self.rng.randrange(self.h)
             # avoid direct spawn on players or greens if possible
-            if any(p.x == x and p.y == y for p in self.players):
+            if (x, y) in self.playerCells:
                 continue
-            self.reds.append(RedNPC(x, y))
+            self.addRed(RedNPC(x, y))
+
+    def addRed(self, red):
+        x, y = red.x, red.y
+        self.reds.adopt(red, x, y)
+        self._placeRed(x, y)
+        for fn in self.listeners:
+            fn(x, y)
+
+    # ---------- NPC phase ----------
+    def npcPhase(self, rng, moveProb):
+        # Seeded mode: exactly the RNG calls of RedNPC.tryMove for every red in order, so a seed
+        # reproduces the same red paths; walks the coordinate arrays without per-red allocations
+        xs, ys = self.reds.xs, self.reds.ys
+        w1, h1 = self.w - 1, self.h - 1
+        steps = self._steps
+        random, shuffle = rng.random, rng.shuffle
+        for i in range(len(xs)):
+            if random() > moveProb:
+                continue
+            steps[:] = RED_STEPS
+            shuffle(steps)
+            dx, dy = steps[0]
+            x, y = xs[i], ys[i]
+            nx = min(max(x + dx, 0), w1)
+            ny = min(max(y + dy, 0), h1)
+            if nx != x or ny != y:
+                self._moveRed(i, nx, ny)
+
+    def npcPhaseVectorized(self, gen, moveProb):
+        # Vectorized mode: one draw from a NumPy Generator decides every red (u <= moveProb moves,
+        # and u / moveProb, uniform for movers, picks the step); only reds that changed cell then
+        # update the index (and journal, dirty cells and listeners when those are in use).
+        # Same rules and odds as the seeded mode, different paths.
+        import numpy as np
+        n = len(self.reds)
+        if not n or moveProb <= 0:
+            return
+        xs = np.frombuffer(self.reds.xs, dtype=np.intc)
+        ys = np.frombuffer(self.reds.ys, dtype=np.intc)
+        u = gen.random(n)
+        step = np.minimum((u * (len(RED_STEPS) / moveProb)).astype(np.intp), len(RED_STEPS) - 1)
+        moving = u <= moveProb
+        dx, dy = np.array(RED_STEPS, dtype=np.intc).T
+        nx = np.clip(xs + dx[step] * moving, 0, self.w - 1)
+        ny = np.clip(ys + dy[step] * moving, 0, self.h - 1)
+        moved = np.flatnonzero((nx != xs) | (ny != ys))
+        if self.journal is not None or self.dirtyCells is not None or self.listeners:
+            del xs, ys  # release the array buffers before writing through them
+            move = self._moveRed
+            for i, x, y in zip(moved.tolist(), nx[moved].tolist(), ny[moved].tolist()):
+                move(i, x, y)
+            return
+        # Nobody watching: patch the occupancy index per moved red, write the arrays in one go
+        cells = self.redCells
+        for ox, oy, x, y in zip(xs[moved].tolist(), ys[moved].tolist(), nx[moved].tolist(), ny[moved].tolist()):
+            key = (ox, oy)
+            left = cells[key] - 1
+            if left:
+                cells[key] = left
+            else:
+                del cells[key]
+            key = (x, y)
+            cells[key] = cells.get(key, 0) + 1
+        xs[:] = nx
+        ys[:] = ny
+
+    def tryMoveRed(self, i, rng, moveProb):
+        # One red's share of npcPhase
+        if rng.random() > moveProb:
+            return
+        steps = self._steps
+        steps[:] = RED_STEPS
+        rng.shuffle(steps)
+        dx, dy = steps[0]
+        x, y = self.reds.xs[i], self.reds.ys[i]
+        nx = min(max(x + dx, 0), self.w - 1)
+        ny = min(max(y + dy, 0), self.h - 1)
+        if nx != x or ny != y:
+            self._moveRed(i, nx, ny)
+
+    # ---------- Occupancy index ----------
+    def playersAt(self, x, y):
+        return self.playerCells.get((x, y), ())
+
+    def redAt(self, x, y):
+        return (x, y) in self.redCells
+
+    def addListener(self, fn):
+        self.listeners.append(fn)
+
+    def removeListener(self, fn):
+        self.listeners.remove(fn)
+
+    def trackDirty(self):
+        self.dirtyCells = set()
+
+    def popDirty(self):
+        cells = self.dirtyCells
+        self.dirtyCells = set()
+        return cells
+
+    def movePlayer(self, player, x, y):
+        if self.dirtyCells is not None:
+            self.dirtyCells.add((player.x, player.y))
+            self.dirtyCells.add((x, y))
+        for fn in self.listeners:
+            fn(player.x, player.y)
+            fn(x, y)
+        self._liftPlayer(player)
+        player.x, player.y = x, y
+        self._placePlayer(player)
+
+    def moveRed(self, red, x, y):
+        self._moveRed(red.i, x, y)
+
+    def _moveRed(self, i, x, y):
+        if self.journal is not None:
+            self.journal.append((i, self.reds.xs[i], self.reds.ys[i]))
+        self._setRed(i, x, y)
+
+    def takeGreen(self, x, y):
+        if (x, y) in self.greens:
+            self.greens.remove((x, y))
+            if self.journal is not None:
+                self.journal.append((None, x, y))
+            if self.dirtyCells is not None:
+                self.dirtyCells.add((x, y))
+            for fn in self.listeners:
+                fn(x, y)
+            return True
+        return False
+
+    # ---------- Snapshot / restore (lookahead search) ----------
+    def snapshot(self, *rngs):
+        # Cheap restore point: journal length + player states (+ states of the given RNGs)
+        if self.journal is None:
+            self.journal = []
+        players = tuple((p.x, p.y, p.score) for p in self.players)
+        return (len(self.journal), players, tuple(rng.getstate() for rng in rngs))
+
+    def restore(self, snap, *rngs):
+        # Undo everything since `snap`; pass the same RNGs given to snapshot() to rewind them too
+        mark, players, rngStates = snap
+        journal = self.journal
+        while len(journal) > mark:
+            i, x, y = journal.pop()
+            if i is None:
+                self.greens.add((x, y))
+                if self.dirtyCells is not None:
+                    self.dirtyCells.add((x, y))
+                for fn in self.listeners:
+                    fn(x, y)
+            else:
+                self._setRed(i, x, y)
+        for p, (x, y, score) in zip(self.players, players):
+            if (p.x, p.y) != (x, y):
+                self.movePlayer(p, x, y)
+            p.score = score
+        for rng, state in zip(rngs, rngStates):
+            rng.setstate(state)
+
+    def releaseSnapshots(self):
+        # Stop journaling; earlier snapshots can no longer be restored
+        self.journal = None
+
+    def _setRed(self, i, x, y):
+        # _moveRed without journaling
+        reds = self.reds
+        ox, oy = reds.xs[i], reds.ys[i]
+        if self.dirtyCells is not None:
+            self.dirtyCells.add((ox, oy))
+            self.dirtyCells.add((x, y))
+        for fn in self.listeners:
+            fn(ox, oy)
+            fn(x, y)
+        self._liftRed(ox, oy)
+        reds.xs[i] = x
+        reds.ys[i] = y
+        self._placeRed(x, y)
+
+    def _placePlayer(self, player):
+        cell = self.playerCells.setdefault((player.x, player.y), [])
+        cell.append(player)
+        if len(cell) > 1:
+            cell.sort(key=lambda p: p.slot)
+
+    def _liftPlayer(self, player):
+        key = (player.x, player.y)
+        cell = self.playerCells[key]
+        cell.remove(player)
+        if not cell:
+            del self.playerCells[key]
+
+    def _placeRed(self, x, y):
+        self.redCells[(x, y)] = self.redCells.get((x, y), 0) + 1
+
+    def _liftRed(self, x, y):
+        n = self.redCells[(x, y)] - 1
+        if n:
+            self.redCells[(x, y)] = n
+        else:
+            del self.redCells[(x, y)]
@@ -0,0 +1,126 @@
+# Match configuration — board size, counts, rules, seeds and agent line-up (JSON round-trip)
+
+import colorsys
+import json
+from settings import GRID_W, GRID_H, NUM_GREENS, NUM_REDS, RED_MOVE_PROB, MAX_ROUNDS, SIGHT_RANGE, SCORES, TURN_MODE, NPC_MODE
+from engine.entities import Player
+from controllers import registry
+
+DEFAULT_SEED = 42
+NPC_SEED_OFFSET = 999 - DEFAULT_SEED  # seed 42 reproduces the historical Random(42)/Random(999) pair
+
+# Standard seats in turn order: (agentId, color); each is drawn as the shape of the same name
+SEATS = [
+    ("triangle", (90, 190, 255)),
+    ("rectangle", (255, 200, 90)),
+    ("pentagon", (180, 120, 255)),
+]
+SHAPES = ("triangle", "rectangle", "pentagon")
+TURN_MODES = ("sequential", "simultaneous")
+NPC_MODES = ("seeded", "vectorized")
+
+# The windowed game: heuristic triangle, LLM rectangle, human pentagon
+DEFAULT_AGENTS = [
+    {"controller": "triangle"},
+    {"controller": "rectangle"},
+    {"controller": "human"},
+]
+
+def seatIdentity(i):
+    # (agentId, color, shape) for seat i: the standard seats first, then generated ones
+    if i < len(SEATS):
+        agentId, color = SEATS[i]
+        return agentId, color, agentId
+    hue = (i * 0.618033988749895) % 1.0
+    r, g, b = colorsys.hsv_to_rgb(hue, 0.55, 0.95)
+    return f"agent{i}", (int(r * 255), int(g * 255), int(b * 255)), SHAPES[i % len(SHAPES)]
+
+class MatchConfig:
+    """
+    Everything that defines a match. Defaults come from settings.py, so MatchConfig() is the
+    standard game. `agents` is a list of dicts, in turn order:
+        {"controller": "triangle", "count": 200, "options": {...}, "id": ..., "shape": ..., "color": [r, g, b]}
+    Only "controller" is required; "count" repeats an entry, and id/color/shape default to the seat's.
+    """
+    FIELDS = ("w", "h", "numGreens", "numReds", "redMoveProb", "maxRounds", "sightRange",
+              "scores", "seed", "npcSeed", "turnMode", "npcMode", "agents")
+
+    def __init__(self, agents=None, w=GRID_W, h=GRID_H, numGreens=NUM_GREENS, numReds=NUM_REDS,
+                 redMoveProb=RED_MOVE_PROB, maxRounds=MAX_ROUNDS, sightRange=SIGHT_RANGE,
+                 scores=None, seed=DEFAULT_SEED, npcSeed=None, turnMode=TURN_MODE, npcMode=NPC_MODE):
+        if turnMode not in TURN_MODES:
+            raise ValueError(f"Unknown turnMode '{turnMode}'. Known: {', '.join(TURN_MODES)}")
+        if npcMode not in NPC_MODES:
+            raise ValueError(f"Unknown npcMode '{npcMode}'. Known: {', '.join(NPC_MODES)}")
+        self.turnMode = turnMode
+        self.npcMode = npcMode
+        self.agents = [dict(a) for a in (agents or DEFAULT_AGENTS)]
+        self.w = w
+        self.h = h
+        self.numGreens = numGreens
+        self.numReds = numReds
+        self.redMoveProb = redMoveProb
+        self.maxRounds = maxRounds
+        self.sightRange = sightRange
+        self.scores = dict(scores or SCORES)
+        self.seed = seed
+        self.npcSeed = seed + NPC_SEED_OFFSET if npcSeed is None else npcSeed
+
+    @classmethod
+    def fromDict(cls, doc):
+        unknown = set(doc) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown match config keys: {', '.join(sorted(unknown))}")
+        return cls(**doc)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as fh:
+            return cls.fromDict(json.load(fh))
+
+    def toDict(self):
+        return {k: getattr(self, k) for k in self.FIELDS}
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.toDict(), fh, indent=2)
+
+    def copy(self, **changes):
+        doc = self.toDict()
+        if "seed" in changes and "npcSeed" not in changes:
+            changes["npcSeed"] = None  # follow the new seed
+        doc.update(changes)
+        return MatchConfig.fromDict(doc)
+
+    def withLineup(self, names):
+        # Same match with one plain agent per controller name
+        return self.copy(agents=[{"controller": n} for n in names])
+
+    def seats(self):
+        """Expanded agent specs: one dict per player with id, color, shape, controller, options."""
+        out = []
+        for spec in self.agents:
+            if "controller" not in spec:
+                raise ValueError(f"Agent entry without a controller: {spec}")
+            count = spec.get("count", 1)
+            for _ in range(count):
+                agentId, color, shape = seatIdentity(len(out))
+                if count == 1:
+                    agentId = spec.get("id", agentId)
+                if spec.get("shape", shape) not in SHAPES:
+                    raise ValueError(f"Unknown shape '{spec['shape']}'. Known: {', '.join(SHAPES)}")
+                out.append({
+                    "id": agentId,
+                    "color": tuple(spec.get("color", color)),
+                    "shape": spec.get("shape", shape),
+                    "controller": spec["controller"],
+                    "options": dict(spec.get("options", {})),
+                })
+        ids = [s["id"] for s in out]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Agent ids must be unique")
+        return out
+
+    def createPlayers(self):
+        return [Player(s["id"], s["color"], registry.create(s["controller"], **s["options"]), s["shape"])
+                for s in self.seats()]
@@ -1,16 +1,19 @@
 # Entities for players and NPCs
 
+from array import array
 from engine.geometry import DIRS, clamp
 
 class Player:
     # AgentId examples: "triangle", "rectangle", "pentagon"
-    def __init__(self, agentId, color, controller):
+    def __init__(self, agentId, color, controller, shape=None):
         self.agentId = agentId
         self.color = color
         self.controller = controller
+        self.shape = shape or agentId  # drawing shape; the standard seats are named after theirs
         self.x = 0
         self.y = 0
         self.score = 0
+        self.slot = 0  # turn-order index, assigned by Board.addPlayer
 
     def applyMove(self, board, move):
         dx, dy = DIRS.get(move, (0, 0))
@@ -18,35 +21,80 @@ class Player:
         ny = clamp(self.y + dy, 0, board.h - 1)
 
         # If a player already occupies nx,ny, we allow moves because turns are sequential
-        self.x, self.y = nx, ny
+        if (nx, ny) != (self.x, self.y):
+            board.movePlayer(self, nx, ny)
 
         # Resolve pickups and hazards
         # Greens
-        if (self.x, self.y) in board.greens:
-            board.greens.remove((self.x, self.y))
+        if board.takeGreen(self.x, self.y):
             self.score += board.scoreValues["GREEN"]
 
         # Reds
-        for r in board.reds:
-            if r.x == self.x and r.y == self.y:
-                self.score += board.scoreValues["RED"]
-                break
+        if board.redAt(self.x, self.y):
+            self.score += board.scoreValues["RED"]
 
 class RedNPC:
+    """
+    One red NPC: a view onto a slot of a Reds array, so x / y read and write the shared arrays.
+    RedNPC(x, y) starts detached with its own one-slot storage; Board.addRed moves it onto the board's.
+    """
+    __slots__ = ("reds", "i", "color")
+
     def __init__(self, x, y, color=(200, 50, 50)):
-        self.x = x
-        self.y = y
         self.color = color
+        Reds().adopt(self, x, y)
+
+    @property
+    def x(self):
+        return self.reds.xs[self.i]
+
+    @x.setter
+    def x(self, v):
+        self.reds.xs[self.i] = v
+
+    @property
+    def y(self):
+        return self.reds.ys[self.i]
+
+    @y.setter
+    def y(self, v):
+        self.reds.ys[self.i] = v
 
     def tryMove(self, board, rng, moveProb=0.5):
-        # 50% chance to move by default
-        if rng.random() > moveProb:
-            return
-        dirs = [(0,1),(0,-1),(1,0),(-1,0),(0,0)]
-        rng.shuffle(dirs)
-        for dx, dy in dirs:
-            nx = min(max(self.x + dx, 0), board.w - 1)
-            ny = min(max(self.y + dy, 0), board.h - 1)
-            # allow overlap with reds, avoid leaving board
-            self.x, self.y = nx, ny
-            break
+        # One red's share of Board.npcPhase (same RNG calls)
+        board.tryMoveRed(self.i, rng, moveProb)
+
+    def moveBy(self, board, dx, dy):
+        nx = min(max(self.x + dx, 0), board.w - 1)
+        ny = min(max(self.y + dy, 0), board.h - 1)
+        # allow overlap with reds, avoid leaving board
+        if (nx, ny) != (self.x, self.y):
+            board.moveRed(self, nx, ny)
+
+class Reds:
+    """Red NPCs as struct-of-arrays: parallel x / y int arrays plus one RedNPC view per slot."""
+    __slots__ = ("xs", "ys", "views")
+
+    def __init__(self):
+        self.xs = array("i")
+        self.ys = array("i")
+        self.views = []
+
+    def adopt(self, red, x, y):
+        red.reds, red.i = self, len(self.views)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.views.append(red)
+
+    def positions(self):
+        # (x, y) per red in slot order, straight from the arrays
+        return zip(self.xs, self.ys)
+
+    def __len__(self):
+        return len(self.views)
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def __getitem__(self, i):
+        return self.views[i]
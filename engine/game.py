@@ -1,133 +1,275 @@
 # Core game loop and turn system
 
-import random
+import os
+import time
 import pygame
-from settings import *
-from engine.board import Board
-from engine.renderer import drawBoard, drawPanel
-from engine.vision import extractObservation
-from engine.entities import Player
-from engine.logger import ThoughtsLogger
-
-# Controllers
-from controllers.triangle_controller import TriangleController
-from controllers.rectangle_controller import RectangleController   # now LLM
-from controllers.human_controller import HumanController           # human pentagon
+from concurrent.futures import ThreadPoolExecutor
+from settings import (CELL, PANEL_W, FPS, FONT_NAME, TURN_DELAY_MS, RENDER_MODE, IDLE_WAIT_MS,
+                      THINKING_REFRESH_MS, DECISION_DEADLINE_MS, DECISION_WORKERS, ROUND_THREADS,
+                      ROUND_PROCESSES, LLM_PREFETCH, INCREMENTAL_OBSERVATION, REPLAY_DIR,
+                      REPLAY_KEYFRAME_EVERY, TELEMETRY, TELEMETRY_OVERLAY, TELEMETRY_OVERLAY_MS,
+                      TELEMETRY_DIR, TELEMETRY_EXPORT_MS, THOUGHTS_LOG_DIR, THOUGHTS_LOG_MAX_MB,
+                      THOUGHTS_LOG_FLUSH_MS)
+from engine.simulation import Simulation
+from engine.config import MatchConfig
+from engine.renderer import drawBoard, drawPanel, fogRect, cellRect
+from engine.telemetry import Telemetry
+from engine.logger import ThoughtsLogger, LogSink
+
+DECISION_READY = pygame.USEREVENT + 1
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, npcSeed=None, config=None):
+        # config: MatchConfig (default: triangle heuristic, rectangle LLM, human pentagon on the
+        # settings.py board); seed/npcSeed override its seeds
+        config = config or MatchConfig()
+        if seed is not None or npcSeed is not None:
+            config = config.copy(seed=config.seed if seed is None else seed, npcSeed=npcSeed)
+        self.sightRange = config.sightRange
+
         pygame.init()
-        totalW = GRID_W * CELL + PANEL_W
-        totalH = GRID_H * CELL
+        totalW = config.w * CELL + PANEL_W
+        totalH = config.h * CELL
         self.screen = pygame.display.set_mode((totalW, totalH))
         pygame.display.set_caption("GeomLab 1")
         self.clock = pygame.time.Clock()
         self.fontSmall = pygame.font.SysFont(FONT_NAME, 16)
         self.fontMono = pygame.font.SysFont(FONT_NAME, 20)
 
-        self.logger = ThoughtsLogger()
-        self.tick = 0
         self.paused = False
 
-        self.board = Board(GRID_W, GRID_H, SCORES)
-        rng = self.board.rng
+        # Optional replay file for this match
+        self.recorder = None
+        if REPLAY_DIR:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            from engine.replay import ReplayRecorder
+            name = f"match-{config.seed}-{time.strftime('%Y%m%d-%H%M%S')}.glr"
+            self.recorder = ReplayRecorder(os.path.join(REPLAY_DIR, name), REPLAY_KEYFRAME_EVERY)
 
-        # Controllers
-        triCtrl = TriangleController()
-        recCtrl = RectangleController()   # ← Synchange LLM agent
-        penCtrl = HumanController()       # ← Human
+        # Optional full thoughts log on disk, written by a background thread
+        sink = None
+        if THOUGHTS_LOG_DIR:
+            sink = LogSink(THOUGHTS_LOG_DIR, f"thoughts-{config.seed}-{time.strftime('%Y%m%d-%H%M%S')}",
+                           THOUGHTS_LOG_MAX_MB * 1024 * 1024, flushInterval=THOUGHTS_LOG_FLUSH_MS / 1000.0)
 
-        # Players
-        tri = Player("triangle", (90, 190, 255), triCtrl)
-        rec = Player("rectangle", (255, 200, 90), recCtrl)
-        pen = Player("pentagon", (180, 120, 255), penCtrl)
+        # Optional timing histograms; None when TELEMETRY is off
+        self.telemetry = Telemetry() if TELEMETRY else None
+        self.overlay = None
+        self.overlayStamp = -TELEMETRY_OVERLAY_MS
+        self.exportStamp = 0
 
-        # Spawn players
-        self.board.addPlayer(tri, 2, 2)
-        self.board.addPlayer(rec, GRID_W - 3, 2)
-        self.board.addPlayer(pen, 2, GRID_H - 3)
+        # Players and controllers come from the config; the simulation core
+        # owns the board, turn order and NPC phase
+        # Simultaneous mode runs each round's decisions side by side
+        self.decider = None
+        if config.turnMode == "simultaneous":
+            from engine.rounds import RoundDecider  # process pools only when rounds are simultaneous
+            self.decider = RoundDecider(ROUND_THREADS, ROUND_PROCESSES)
+        self.sim = Simulation.fromConfig(config, recorder=self.recorder, telemetry=self.telemetry,
+                                         decider=self.decider, logger=ThoughtsLogger(sink))
+        self.sim.speculate = LLM_PREFETCH
+        self.sim.incremental = INCREMENTAL_OBSERVATION
+        self.board = self.sim.board
+        self.logger = self.sim.logger
 
-        self.board.spawnGreens(NUM_GREENS)
-        self.board.spawnReds(NUM_REDS)
+        # Decisions run on worker threads so the window keeps pumping events
+        self.decisionPool = ThreadPoolExecutor(max_workers=DECISION_WORKERS, thread_name_prefix="decide")
+        self.pending = None  # (future, startedMs, player or None for a whole round) while agents think
+        self.stale = {}  # player -> decide() future that missed its deadline and may still be running
 
-        self.turnOrder = [tri, rec, pen]
-        self.activeIdx = 0
+        # Dirty-rectangle mode: push only changed regions, sleep on the event queue when idle
+        self.dirtyMode = RENDER_MODE == "dirty"
+        self.lastFog = None  # (x, y) of the fog window currently on screen
+        self.needFull = True
+        if self.dirtyMode:
+            self.board.trackDirty()
 
-        self.redRng = random.Random(999)
+    def startDecision(self, now):
+        # Returns True once the active agent's turn has been taken or handed to a worker
+        if self.sim.waitingForInput():
+            return False
+        if self.sim.simultaneous:
+            # RoundDecider enforces the deadline per agent, so the round future always finishes
+            fut = self.decisionPool.submit(self.sim.decideRound, self.sim.observeRound(),
+                                           DECISION_DEADLINE_MS / 1000.0)
+            fut.add_done_callback(self.wake)
+            self.pending = (fut, now, None)
+            return True
+        p = self.sim.activePlayer()
+        if hasattr(p.controller, "has_move"):
+            # Human input is already queued; nothing to wait for
+            self.sim.stepTurn()
+            return True
+        late = self.stale.get(p)
+        if late is not None:
+            if not late.done():
+                # Controllers are not thread-safe: never call decide() while an earlier call still runs
+                self.sim.applyDecision({"move": "STAY", "why": "Still deciding an earlier turn",
+                                        "thoughts": ["The previous decide() call has not returned yet"]})
+                return True
+            del self.stale[p]
+        tel = self.telemetry
+        if tel is None:
+            fut = self.decisionPool.submit(p.controller.decide, self.sim.observe())
+        else:
+            t0 = tel.clock()
+            obs = self.sim.observe()
+            tel.record("observe", p.agentId, tel.clock() - t0)
+            fut = self.decisionPool.submit(self.timedDecide, p, obs)
+        # Wake the event loop as soon as the answer lands
+        fut.add_done_callback(self.wake)
+        self.pending = (fut, now, p)
+        return True
 
-    def gameEnded(self):
-        return len(self.board.greens) == 0 or self.tick >= MAX_ROUNDS
+    def timedDecide(self, p, obs):
+        # Runs on a worker thread; Histogram updates are a few plain attribute writes
+        t0 = self.telemetry.clock()
+        try:
+            return p.controller.decide(obs)
+        finally:
+            self.telemetry.record("decide", p.agentId, self.telemetry.clock() - t0)
 
-    def npcPhase(self):
-        for r in self.board.reds:
-            r.tryMove(self.board, self.redRng, RED_MOVE_PROB)
+    def wake(self, _future=None):
+        # Called from worker threads; event.post is thread-safe
+        if pygame.get_init():
+            pygame.event.post(pygame.event.Event(DECISION_READY))
 
-    def stepTurn(self):
-        p = self.turnOrder[self.activeIdx]
+    def pollDecision(self, now):
+        # Returns True once the pending decision has been applied
+        fut, started, p = self.pending
+        if p is None:
+            return self.pollRound(now)
+        if fut.done():
+            try:
+                decision = fut.result()
+            except Exception as e:
+                decision = {"move": "STAY", "why": "Controller error", "thoughts": [f"{type(e).__name__}: {e}"]}
+        elif now - started >= DECISION_DEADLINE_MS:
+            if not fut.cancel():
+                # A running call cannot be interrupted; its late answer is dropped and the
+                # controller sits out its turns until the call returns
+                self.stale[p] = fut
+            decision = {"move": "STAY", "why": "Decision deadline exceeded",
+                        "thoughts": [f"No answer within {DECISION_DEADLINE_MS} ms"]}
+        else:
+            return False
+        self.pending = None
+        if self.telemetry is not None:
+            # Wall time from hand-off to apply, as the loop saw it (includes deadline fallbacks)
+            self.telemetry.record("wait", p.agentId, (now - started) / 1000.0)
+        self.sim.applyDecision(decision)
+        return True
 
-        # If human turn and no move yet -> wait
-        from controllers.human_controller import HumanController
-        if isinstance(p.controller, HumanController) and not p.controller.has_move():
-            return  # do not advance; render continues until keypress
+    def pollRound(self, now):
+        fut, started, _ = self.pending
+        if not fut.done():
+            return False
+        self.pending = None
+        if self.telemetry is not None:
+            self.telemetry.record("wait", "round", (now - started) / 1000.0)
+        self.sim.applyRound(fut.result())
+        return True
 
-        obs = extractObservation(self.board, p, self.tick)
-        decision = p.controller.decide(obs)
+    def humanPlayer(self):
+        active = self.sim.activePlayer()
+        if hasattr(active.controller, "set_key"):
+            return active
+        return next((pl for pl in self.sim.turnOrder if hasattr(pl.controller, "set_key")), None)
 
-        move = decision.get("move", "STAY")
-        why = decision.get("why", "")
-        thoughts = decision.get("thoughts", [])
+    def thinking(self, now):
+        if self.pending is None:
+            return None
+        _, started, p = self.pending
+        return (p.agentId if p is not None else "*", now - started)
 
-        # Validate move
-        validMoves = {"UP","DOWN","LEFT","RIGHT","STAY"}
-        if move not in validMoves:
-            thoughts = list(thoughts) + [f"Invalid move '{move}', switching to STAY"]
-            move = "STAY"
+    def render(self):
+        # Returns True when something was pushed to the display
+        if self.dirtyMode:
+            return self.renderDirty()
+        activeId = self.sim.activePlayer().agentId
+        drawBoard(self.screen, self.board, activeId, self.fontSmall, self.fontMono, self.sightRange)
+        drawPanel(self.screen, self.board, activeId, self.logger, (self.fontSmall, self.fontMono), self.sim.tick,
+                  self.thinking(pygame.time.get_ticks()), self.overlay)
+        pygame.display.flip()
+        return True
 
-        # Apply + compute outcome
-        prevScore = p.score
-        p.applyMove(self.board, move)
-        delta = p.score - prevScore
+    def renderDirty(self):
+        ap = self.sim.activePlayer()
+        fog = (ap.x, ap.y)
+        rects = [cellRect(x, y) for (x, y) in self.board.popDirty()]
+        if fog != self.lastFog:
+            rects.append(fogRect(self.board, ap.x, ap.y, self.sightRange))
+            if self.lastFog is not None:
+                rects.append(fogRect(self.board, self.lastFog[0], self.lastFog[1], self.sightRange))
 
-        # Allow agent to learn from outcome
-        if hasattr(p.controller, "postOutcome"):
-            try:
-                p.controller.postOutcome(self.tick, decision, delta)
-            except Exception as e:
-                # don't crash the game if an agent fails to log
-                pass
+        # The panel is cached, so drawing it is cheap and tells us whether it changed
+        panelChanged = drawPanel(self.screen, self.board, ap.agentId, self.logger, (self.fontSmall, self.fontMono),
+                                 self.sim.tick, self.thinking(pygame.time.get_ticks()), self.overlay)
+        if panelChanged:
+            rects.append(pygame.Rect(self.board.w * CELL, 0, PANEL_W, self.board.h * CELL))
 
-        # Log thoughts
-        header = f"move={move} | why={why} | Δscore={delta:+d}"
-        self.logger.append(p.agentId, header, thoughts)
+        if not rects and not self.needFull:
+            return False
+        drawBoard(self.screen, self.board, ap.agentId, self.fontSmall, self.fontMono, self.sightRange)
+        self.lastFog = fog
+        if self.needFull:
+            pygame.display.flip()
+            self.needFull = False
+        else:
+            pygame.display.update(rects)
+        return True
 
-        # Next turn
-        self.activeIdx = (self.activeIdx + 1) % len(self.turnOrder)
-        if self.activeIdx == 0:
-            self.npcPhase()
-            self.tick += 1
+    def updateTelemetry(self, now, final=False):
+        tel = self.telemetry
+        if TELEMETRY_OVERLAY and now - self.overlayStamp >= TELEMETRY_OVERLAY_MS:
+            tel.collect(self.sim.turnOrder)
+            self.overlay = tel.overlayLines()
+            self.overlayStamp = now
+        if final or now - self.exportStamp >= TELEMETRY_EXPORT_MS:
+            tel.collect(self.sim.turnOrder)
+            os.makedirs(TELEMETRY_DIR, exist_ok=True)
+            tel.writeJsonl(os.path.join(TELEMETRY_DIR, "telemetry.jsonl"), seed=self.sim.seed, tick=self.sim.tick)
+            tel.writePrometheus(os.path.join(TELEMETRY_DIR, "geomlab.prom"))
+            self.exportStamp = now
 
-    def render(self):
-        activeId = self.turnOrder[self.activeIdx].agentId
-        drawBoard(self.screen, self.board, activeId, self.fontSmall, self.fontMono, SIGHT_RANGE)
-        drawPanel(self.screen, self.board, activeId, self.logger, (self.fontSmall, self.fontMono), self.tick)
-        pygame.display.flip()
+    def idleTimeout(self, now, lastTurnStamp):
+        # How long the loop may sleep on the event queue before something is due
+        if self.pending is not None:
+            return THINKING_REFRESH_MS
+        if self.paused or self.sim.gameEnded() or self.sim.waitingForInput():
+            return IDLE_WAIT_MS
+        return max(1, TURN_DELAY_MS - (now - lastTurnStamp))
+
+    def nextEvents(self, waitMs):
+        if waitMs <= 0:
+            return pygame.event.get()
+        first = pygame.event.wait(waitMs)
+        if first.type == pygame.NOEVENT:
+            return []
+        return [first] + pygame.event.get()
 
     def run(self):
         running = True
         lastTurnStamp = pygame.time.get_ticks()
+        lastFrame = None
+        waitMs = 0
 
         while running:
-            for event in pygame.event.get():
+            for event in self.nextEvents(waitMs):
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.needFull = True
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         self.paused = not self.paused
                     elif event.key == pygame.K_r:
                         running = False
                     else:
-                        # Route keys to HumanController
-                        p = next(pl for pl in self.turnOrder if pl.agentId == "pentagon")
+                        # Route keys to the human-controlled player (the active one if several)
+                        p = self.humanPlayer()
+                        if p is None:
+                            continue
                         key_name = pygame.key.name(event.key)
                         # Normalize pygame key names to our map
                         canonical = {
@@ -138,13 +280,41 @@ class Game:
                             p.controller.set_key(canonical)
 
             now = pygame.time.get_ticks()
-            if not self.paused and not self.gameEnded():
-                # simple pacing: one decision per TURN_DELAY_MS
-                if now - lastTurnStamp >= TURN_DELAY_MS:
-                    self.stepTurn()
+            if self.pending is not None:
+                # keep polling while paused so a late answer is not mistaken for a timeout
+                if self.pollDecision(now):
                     lastTurnStamp = now
+            elif not self.paused and not self.sim.gameEnded():
+                # simple pacing: one decision per TURN_DELAY_MS
+                if now - lastTurnStamp >= TURN_DELAY_MS and self.startDecision(now):
+                    if self.pending is None:
+                        lastTurnStamp = now
 
-            self.render()
-            self.clock.tick(FPS)
+            waitMs = 0
+            tel = self.telemetry
+            if tel is None:
+                drawn = self.render()
+            else:
+                self.updateTelemetry(now)
+                t0 = tel.clock()
+                drawn = self.render()
+                t1 = tel.clock()
+                if drawn:
+                    tel.record("render", "-", t1 - t0)
+                    if lastFrame is not None:
+                        tel.record("frame", "-", t1 - lastFrame)
+                    lastFrame = t1
+            if drawn or not self.dirtyMode:
+                self.clock.tick(FPS)
+            else:
+                waitMs = self.idleTimeout(pygame.time.get_ticks(), lastTurnStamp)
 
+        self.decisionPool.shutdown(wait=False, cancel_futures=True)
+        if self.decider is not None:
+            self.decider.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.logger.close()
+        if self.telemetry is not None:
+            self.updateTelemetry(pygame.time.get_ticks(), final=True)
         pygame.quit()
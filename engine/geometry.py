@@ -13,3 +13,13 @@ DIRS = {
 
 def manhattan(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+_diamonds = {}
+
+def diamondOffsets(r):
+    # (dx, dy) offsets with |dx| + |dy| <= r, in row-major order
+    offs = _diamonds.get(r)
+    if offs is None:
+        offs = tuple((dx, dy) for dy in range(-r, r + 1) for dx in range(-r, r + 1) if abs(dx) + abs(dy) <= r)
+        _diamonds[r] = offs
+    return offs
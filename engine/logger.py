@@ -1,20 +1,181 @@
-# Thoughts logger per agent
+# Thoughts logger per agent, with an optional streaming sink (rotating gzip JSONL on disk)
 
+import glob
+import gzip
+import json
+import os
+import queue
+import threading
+import time
 from collections import deque
 from settings import LOG_HISTORY_PER_AGENT
 
 class ThoughtsLogger:
-    def __init__(self):
+    """
+    Last LOG_HISTORY_PER_AGENT entries per agent for the panel; with a LogSink every entry
+    is also streamed to disk, so memory stays bounded while the full log is kept.
+    `context` fields (e.g. {"seed": 7}) are added to each record sent to the sink.
+    """
+    def __init__(self, sink=None, context=None):
         self.byAgent = {}
+        self.version = 0  # bumped on every append so the UI knows when to redraw
+        self.sink = sink
+        self.context = context or {}
 
     def ensure(self, agentId):
         if agentId not in self.byAgent:
             self.byAgent[agentId] = deque(maxlen=LOG_HISTORY_PER_AGENT)
 
-    def append(self, agentId, header, lines):
+    def append(self, agentId, header, lines, tick=None):
         self.ensure(agentId)
-        self.byAgent[agentId].append((header, list(lines or [])))
+        entry = (header, list(lines or []))
+        self.byAgent[agentId].append(entry)
+        self.version += 1
+        if self.sink is not None:
+            record = {"agent": agentId, "tick": tick, "header": header, "thoughts": entry[1]}
+            record.update(self.context)
+            self.sink.write(record)
 
     def get(self, agentId):
         self.ensure(agentId)
         return list(self.byAgent[agentId])
+
+    def tail(self, agentId, n):
+        # The last n entries, oldest first, read in place (no copy of the history)
+        entries = self.byAgent.get(agentId)
+        if not entries:
+            return
+        for i in range(-min(n, len(entries)), 0):
+            yield entries[i]
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+
+class LogSink:
+    """
+    Background writer of JSONL records to gzip files in `directory`:
+    <prefix>-0001.jsonl.gz, <prefix>-0002.jsonl.gz, ... rotating after `maxBytes` of uncompressed
+    text (checked between batches); `maxFiles` (if set) keeps only the newest files. write() only enqueues; the writer thread
+    encodes and writes in batches and sync-flushes every `flushInterval` seconds, so a crash
+    loses at most that much and the files stay readable up to the last flush. If the writer
+    falls `maxQueue` records behind, new records are dropped (counted in `dropped`) rather than
+    stalling the caller. If the writer thread dies (e.g. a record that is not JSON-serializable),
+    the next write() and close() raise RuntimeError instead of queueing records nobody writes.
+    """
+    BATCH = 1024  # records encoded and written per wake-up, at most
+
+    def __init__(self, directory, prefix="thoughts", maxBytes=64 * 1024 * 1024, maxFiles=None,
+                 flushInterval=1.0, maxQueue=100_000, compresslevel=6):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.maxBytes = maxBytes
+        self.maxFiles = maxFiles
+        self.flushInterval = flushInterval
+        self.compresslevel = compresslevel
+        self.queue = queue.SimpleQueue()
+        self.maxQueue = maxQueue
+        self.written = 0
+        self.dropped = 0
+        self.files = []
+        self.fh = None
+        self.size = 0
+        self.error = None  # what stopped the writer thread, if anything
+        self.thread = threading.Thread(target=self._run, name=f"logsink-{prefix}", daemon=True)
+        self.thread.start()
+
+    def write(self, record):
+        if self.error is not None:
+            self._raise()
+        if self.queue.qsize() >= self.maxQueue:
+            self.dropped += 1
+            return
+        self.queue.put(record)
+
+    def close(self):
+        # Drain what is queued, flush and close the current file
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            self._raise()
+
+    def _raise(self):
+        raise RuntimeError(f"log writer for {self.prefix!r} stopped: {self.error!r}") from self.error
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "queued": self.queue.qsize(),
+                "files": len(self.files), "error": repr(self.error) if self.error is not None else None}
+
+    def _open(self):
+        path = os.path.join(self.directory, f"{self.prefix}-{len(self.files) + 1:04d}.jsonl.gz")
+        self.fh = gzip.open(path, "wt", encoding="utf-8", compresslevel=self.compresslevel)
+        self.size = 0
+        self.files.append(path)
+        if self.maxFiles and len(self.files) > self.maxFiles:
+            os.remove(self.files[-self.maxFiles - 1])
+
+    def _run(self):
+        try:
+            self._loop()
+        except BaseException as e:
+            self.error = e
+        finally:
+            # Close the current file so what was written so far ends with a complete gzip stream
+            if self.fh is not None:
+                self.fh.close()
+
+    def _loop(self):
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        nextFlush = time.monotonic() + self.flushInterval
+        dirty = False
+        done = False
+        while not done:
+            batch = []
+            try:
+                record = self.queue.get(timeout=max(0.0, nextFlush - time.monotonic()))
+                while True:
+                    if record is None:
+                        done = True
+                        break
+                    batch.append(encode(record))
+                    if len(batch) >= self.BATCH:
+                        break
+                    record = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                self._emit(batch)
+                dirty = True
+            now = time.monotonic()
+            if dirty and (done or now >= nextFlush):
+                self.fh.flush()
+                dirty = False
+            if now >= nextFlush:
+                nextFlush = now + self.flushInterval
+
+    def _emit(self, lines):
+        # One write per batch; rotation happens between batches, so a file may overshoot
+        # maxBytes by up to one batch
+        if self.fh is None or self.size >= self.maxBytes:
+            if self.fh is not None:
+                self.fh.close()
+            self._open()
+        text = "\n".join(lines) + "\n"
+        self.fh.write(text)
+        self.size += len(text)
+        self.written += len(lines)
+
+def readLog(directory, prefix="thoughts"):
+    # Records from a LogSink's files, oldest first. A file still being written (or left by a
+    # crash) has no gzip end marker yet; it is read up to its last complete line.
+    for path in sorted(glob.glob(os.path.join(directory, f"{prefix}-*.jsonl.gz"))):
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            try:
+                for line in fh:
+                    if not line.endswith("\n"):
+                        break
+                    yield json.loads(line)
+            except EOFError:
+                pass
@@ -1,20 +1,87 @@
 # Renderer and UI panel
 
+import heapq
 import pygame
-from settings import CELL, GRID_COLOR, BG_COLOR, PANEL_W, FOG_COLOR, FONT_NAME
-from engine.geometry import manhattan
+from collections import OrderedDict
+from settings import TEXT_CACHE_SIZE, CELL, GRID_COLOR, BG_COLOR, PANEL_W, FOG_COLOR, FONT_NAME
+from engine.geometry import diamondOffsets
 
-def drawBoard(screen, board, activeId, fontSmall, fontMono, sightRange):
-    screen.fill(BG_COLOR)
+# Static layers, built once per board geometry / sight range and blitted every frame
+_layers = {}
+
+def _cachedLayer(key, build):
+    surf = _layers.get(key)
+    if surf is None:
+        surf = build()
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert_alpha() if surf.get_flags() & pygame.SRCALPHA else surf.convert()
+        _layers[key] = surf
+    return surf
+
+def gridLayer(w, h):
+    def build():
+        gridWpx, gridHpx = w * CELL, h * CELL
+        surf = pygame.Surface((gridWpx, gridHpx))
+        surf.fill(BG_COLOR)
+        for x in range(w + 1):
+            pygame.draw.line(surf, GRID_COLOR, (x * CELL, 0), (x * CELL, gridHpx))
+        for y in range(h + 1):
+            pygame.draw.line(surf, GRID_COLOR, (0, y * CELL), (gridWpx, y * CELL))
+        return surf
+    return _cachedLayer(("grid", w, h), build)
+
+def fogSheet(w, h):
+    # Plain fog covering the whole grid; fog outside the sight window is cut from it
+    def build():
+        surf = pygame.Surface((w * CELL, h * CELL), pygame.SRCALPHA)
+        surf.fill(FOG_COLOR)
+        return surf
+    return _cachedLayer(("fogSheet", w, h), build)
+
+def fogHole(sightRange):
+    # (2r+1)^2-cell fog tile with the sight diamond punched out of its centre
+    def build():
+        side = 2 * sightRange + 1
+        surf = pygame.Surface((side * CELL, side * CELL), pygame.SRCALPHA)
+        surf.fill(FOG_COLOR)
+        for dx, dy in diamondOffsets(sightRange):
+            rect = pygame.Rect((sightRange + dx) * CELL, (sightRange + dy) * CELL, CELL, CELL)
+            surf.fill((0, 0, 0, 0), rect)
+        return surf
+    return _cachedLayer(("fogHole", sightRange), build)
+
+def fogRect(board, x, y, sightRange):
+    # Screen area whose fog depends on a sight window centred at (x, y)
+    side = (2 * sightRange + 1) * CELL
+    rect = pygame.Rect((x - sightRange) * CELL, (y - sightRange) * CELL, side, side)
+    return rect.clip(pygame.Rect(0, 0, board.w * CELL, board.h * CELL))
 
+def cellRect(x, y):
+    return pygame.Rect(x * CELL, y * CELL, CELL, CELL)
+
+def drawFog(screen, board, player, sightRange):
     gridWpx = board.w * CELL
     gridHpx = board.h * CELL
+    side = (2 * sightRange + 1) * CELL
+    hx = (player.x - sightRange) * CELL
+    hy = (player.y - sightRange) * CELL
+
+    sheet = fogSheet(board.w, board.h)
+    prevClip = screen.get_clip()
+    screen.set_clip(pygame.Rect(0, 0, gridWpx, gridHpx))
+    # Fog above, below, left and right of the sight window
+    for rect in (pygame.Rect(0, 0, gridWpx, hy),
+                 pygame.Rect(0, hy + side, gridWpx, gridHpx - (hy + side)),
+                 pygame.Rect(0, hy, hx, side),
+                 pygame.Rect(hx + side, hy, gridWpx - (hx + side), side)):
+        rect = rect.clip(screen.get_clip())
+        if rect.width > 0 and rect.height > 0:
+            screen.blit(sheet, rect.topleft, rect)
+    screen.blit(fogHole(sightRange), (hx, hy))
+    screen.set_clip(prevClip)
 
-    # Grid
-    for x in range(board.w + 1):
-        pygame.draw.line(screen, GRID_COLOR, (x * CELL, 0), (x * CELL, gridHpx))
-    for y in range(board.h + 1):
-        pygame.draw.line(screen, GRID_COLOR, (0, y * CELL), (gridWpx, y * CELL))
+def drawBoard(screen, board, activeId, fontSmall, fontMono, sightRange):
+    screen.blit(gridLayer(board.w, board.h), (0, 0))
 
     # Greens
     for (gx, gy) in board.greens:
@@ -22,8 +89,8 @@ def drawBoard(screen, board, activeId, fontSmall, fontMono, sightRange):
         pygame.draw.circle(screen, (60, 200, 80), (cx, cy), CELL // 3)
 
     # Reds
-    for r in board.reds:
-        cx, cy = r.x * CELL + CELL // 2, r.y * CELL + CELL // 2
+    for rx, ry in board.reds.positions():
+        cx, cy = rx * CELL + CELL // 2, ry * CELL + CELL // 2
         pygame.draw.circle(screen, (200, 60, 60), (cx, cy), CELL // 3)
 
     # Players
@@ -32,26 +99,16 @@ def drawBoard(screen, board, activeId, fontSmall, fontMono, sightRange):
 
     # Fog-of-war for the active player only
     ap = next(pl for pl in board.players if pl.agentId == activeId)
-    fog = pygame.Surface((gridWpx, gridHpx), pygame.SRCALPHA)
-    for y in range(board.h):
-        for x in range(board.w):
-            if manhattan((ap.x, ap.y), (x, y)) > sightRange:
-                rect = pygame.Rect(x * CELL, y * CELL, CELL, CELL)
-                fog.fill(FOG_COLOR, rect)
-    screen.blit(fog, (0, 0))
-
-    # Right panel background
-    panelRect = pygame.Rect(gridWpx, 0, PANEL_W, gridHpx)
-    pygame.draw.rect(screen, (28, 30, 34), panelRect)
+    drawFog(screen, board, ap, sightRange)
 
 def drawShape(screen, player):
     xpx = player.x * CELL
     ypx = player.y * CELL
     c = player.color
-    if player.agentId == "triangle":
+    if player.shape == "triangle":
         pts = [(xpx + CELL // 2, ypx + 4), (xpx + 4, ypx + CELL - 4), (xpx + CELL - 4, ypx + CELL - 4)]
         pygame.draw.polygon(screen, c, pts)
-    elif player.agentId == "rectangle":
+    elif player.shape == "rectangle":
         rect = pygame.Rect(xpx + 4, ypx + 6, CELL - 8, CELL - 12)
         pygame.draw.rect(screen, c, rect)
     else:
@@ -65,34 +122,99 @@ def drawShape(screen, player):
             pts.append((cx + int(r * math.cos(ang)), cy + int(r * math.sin(ang))))
         pygame.draw.polygon(screen, c, pts)
 
-def drawPanel(screen, board, activeId, logger, fonts, tick):
-    fontSmall, fontMono = fonts
+# Text surfaces keyed by (font, text, color), least recently used evicted first
+_textCache = OrderedDict()
+
+def renderText(font, text, color):
+    key = (font, text, color)
+    surf = _textCache.get(key)
+    if surf is None:
+        surf = font.render(text, True, color)
+        _textCache[key] = surf
+        if len(_textCache) > TEXT_CACHE_SIZE:
+            _textCache.popitem(last=False)
+    else:
+        _textCache.move_to_end(key)
+    return surf
+
+# Offscreen panel, re-composed only when its inputs change
+_panel = {"key": None, "surf": None}
+
+def drawPanel(screen, board, activeId, logger, fonts, tick, thinking=None, overlay=None):
+    # Returns True when the panel content changed since the previous call;
+    # overlay: optional text lines (telemetry) pinned to the bottom of the panel
     gridWpx = board.w * CELL
-    x0 = gridWpx + 12
+    gridHpx = board.h * CELL
+    thinkingLabel = None
+    if thinking:
+        thinkingLabel = (thinking[0], f"{thinking[1] / 1000:.1f}s")
+    key = (logger.version, tick, activeId, len(board.greens), tuple(p.score for p in board.players),
+           thinkingLabel, gridHpx, fonts, tuple(overlay) if overlay else None)
+    changed = _panel["key"] != key
+    if changed:
+        if _panel["surf"] is None or _panel["surf"].get_height() != gridHpx:
+            _panel["surf"] = pygame.Surface((PANEL_W, gridHpx))
+        composePanel(_panel["surf"], board, activeId, logger, fonts, tick, thinkingLabel)
+        if overlay:
+            composeOverlay(_panel["surf"], overlay, fonts[0])
+        _panel["key"] = key
+    screen.blit(_panel["surf"], (gridWpx, 0))
+    return changed
+
+# Large line-ups: the panel lists the active agent plus the leaders, and splits the thought groups between them
+PANEL_MAX_AGENTS = 6
+PANEL_THOUGHT_GROUPS = 18
+
+def panelAgents(board, activeId):
+    players = board.players
+    if len(players) <= PANEL_MAX_AGENTS:
+        return players
+    shown = heapq.nlargest(PANEL_MAX_AGENTS, players, key=lambda p: p.score)
+    if all(p.agentId != activeId for p in shown):
+        shown[-1] = next(p for p in players if p.agentId == activeId)
+    return shown
+
+def composePanel(surf, board, activeId, logger, fonts, tick, thinkingLabel):
+    fontSmall, fontMono = fonts
+    surf.fill((28, 30, 34))
+    x0 = 12
     y = 10
 
     # Header
-    screen.blit(fontMono.render("GeomLab 1", True, (230, 230, 230)), (x0, y)); y += 26
-    screen.blit(fontSmall.render(f"Tick: {tick}", True, (200, 200, 200)), (x0, y)); y += 22
-    screen.blit(fontSmall.render(f"Greens left: {len(board.greens)}", True, (180, 220, 180)), (x0, y)); y += 22
+    surf.blit(renderText(fontMono, "GeomLab 1", (230, 230, 230)), (x0, y)); y += 26
+    surf.blit(renderText(fontSmall, f"Tick: {tick}", (200, 200, 200)), (x0, y)); y += 22
+    surf.blit(renderText(fontSmall, f"Greens left: {len(board.greens)}", (180, 220, 180)), (x0, y)); y += 22
 
     y += 6
+    shown = panelAgents(board, activeId)
+    groups = PANEL_THOUGHT_GROUPS // len(shown)
     # Player scores
-    for p in board.players:
+    for p in shown:
         label = f"{p.agentId:<9}  score: {p.score}"
         color = (220, 220, 220) if p.agentId != activeId else (255, 240, 180)
-        screen.blit(fontMono.render(label, True, color), (x0, y))
+        surf.blit(renderText(fontMono, label, color), (x0, y))
         y += 22
 
     y += 8
 
     # Thoughts for each agent
-    for p in board.players:
-        screen.blit(fontMono.render(f"[{p.agentId}] thoughts", True, (180, 180, 255)), (x0, y)); y += 22
-        lines = logger.get(p.agentId)
-        # Show last 6 groups per agent
-        for header, msgs in list(lines)[-6:]:
-            screen.blit(fontSmall.render(f"• {header}", True, (210, 210, 210)), (x0, y)); y += 18
+    for p in shown:
+        surf.blit(renderText(fontMono, f"[{p.agentId}] thoughts", (180, 180, 255)), (x0, y)); y += 22
+        if thinkingLabel and thinkingLabel[0] in (p.agentId, "*"):  # "*": the whole round is thinking
+            surf.blit(renderText(fontSmall, f"• thinking… {thinkingLabel[1]}", (255, 240, 180)), (x0, y)); y += 18
+        # Show the last few groups per agent (6 each with three agents)
+        for header, msgs in logger.tail(p.agentId, groups):
+            surf.blit(renderText(fontSmall, f"• {header}", (210, 210, 210)), (x0, y)); y += 18
             for m in msgs[:3]:
-                screen.blit(fontSmall.render(f"  {m}", True, (170, 190, 200)), (x0, y)); y += 16
+                surf.blit(renderText(fontSmall, f"  {m}", (170, 190, 200)), (x0, y)); y += 16
         y += 6
+
+def composeOverlay(surf, lines, font):
+    # Dark strip at the bottom of the panel, drawn over the thoughts
+    h = 8 + 16 * len(lines)
+    top = surf.get_height() - h
+    surf.fill((14, 15, 18), (0, top, PANEL_W, h))
+    y = top + 4
+    for line in lines:
+        surf.blit(renderText(font, line, (150, 220, 150)), (12, y))
+        y += 16
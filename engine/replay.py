@@ -0,0 +1,362 @@
+# Binary match replays: append-only recorder and memory-mapped reader
+#
+# Layout (little-endian):
+#   header    magic "GLRP", version, seeds, board size, keyframe interval, sight range, seats (id, shape, color),
+#             score values
+#   records   1-byte tag + payload, in play order:
+#               S  string (interned why/thought text; ids count up from 0)
+#               T  turn: seat, move code, score delta, why id, thought ids
+#               N  NPC phase: one step code per red
+#               K  keyframe: tick, turn index, players, greens, reds (at tick 0 and every N ticks)
+#   footer    X  keyframe and string offsets, then (index offset, "GLRX") as the last 12 bytes
+# A file without a footer (crashed recorder) is still readable; the reader rebuilds the index by scanning.
+
+import mmap
+import struct
+from engine.board import Board
+from engine.entities import Player, RedNPC
+from engine.config import SHAPES
+
+MAGIC = b"GLRP"
+TRAILER_MAGIC = b"GLRX"
+VERSION = 3
+
+MOVES = ["UP", "DOWN", "LEFT", "RIGHT", "STAY"]
+MOVE_CODES = {m: i for i, m in enumerate(MOVES)}
+STEPS = [(0, -1), (0, 1), (-1, 0), (1, 0), (0, 0)]  # same order as MOVES
+STEP_CODES = {d: i for i, d in enumerate(STEPS)}
+
+TAG_STRING = ord("S")
+TAG_TURN = ord("T")
+TAG_NPC = ord("N")
+TAG_KEYFRAME = ord("K")
+TAG_INDEX = ord("X")
+
+HEADER = struct.Struct("<4sHqqHHHHH")
+SEAT = struct.Struct("<BB3B")
+SCORE_VALUES = struct.Struct("<hh")
+TURN = struct.Struct("<BHBhIH")
+COUNT = struct.Struct("<BI")
+U32 = struct.Struct("<I")
+U64 = struct.Struct("<Q")
+KEYFRAME = struct.Struct("<BIH")
+PLAYER = struct.Struct("<HHi")
+CELL = struct.Struct("<HH")
+KEY_INDEX = struct.Struct("<IQ")
+TRAILER = struct.Struct("<Q4s")
+
+class ReplayRecorder:
+    """
+    Writes one match to `path`. Pass it to Simulation(recorder=...); close() (or leaving a
+    `with` block) appends the index footer.
+    """
+    def __init__(self, path, keyframeEvery=20):
+        self.path = path
+        self.keyframeEvery = keyframeEvery
+        self.fh = open(path, "wb")
+        self.pos = 0
+        self.strings = {}
+        self.stringOffsets = []
+        self.keyframes = []  # (tick, offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, data):
+        self.fh.write(data)
+        self.pos += len(data)
+
+    def _intern(self, text):
+        sid = self.strings.get(text)
+        if sid is None:
+            sid = len(self.stringOffsets)
+            self.strings[text] = sid
+            self.stringOffsets.append(self.pos)
+            raw = text.encode("utf-8")
+            self._write(bytes((TAG_STRING,)) + U32.pack(len(raw)) + raw)
+        return sid
+
+    def begin(self, sim):
+        board = sim.board
+        self._write(HEADER.pack(MAGIC, VERSION, sim.seed, sim.npcSeed, board.w, board.h,
+                                self.keyframeEvery, sim.config.sightRange, len(sim.turnOrder)))
+        for p in sim.turnOrder:
+            raw = p.agentId.encode("utf-8")
+            self._write(SEAT.pack(len(raw), SHAPES.index(p.shape), *p.color) + raw)
+        self._write(SCORE_VALUES.pack(board.scoreValues["GREEN"], board.scoreValues["RED"]))
+        self.keyframe(sim)
+
+    def keyframe(self, sim):
+        board = sim.board
+        self.keyframes.append((sim.tick, self.pos))
+        parts = [KEYFRAME.pack(TAG_KEYFRAME, sim.tick, sim.activeIdx)]
+        parts += [PLAYER.pack(p.x, p.y, p.score) for p in sim.turnOrder]
+        parts.append(U32.pack(len(board.greens)))
+        parts += [CELL.pack(x, y) for (x, y) in sorted(board.greens)]
+        parts.append(U32.pack(len(board.reds)))
+        parts += [CELL.pack(x, y) for x, y in board.reds.positions()]
+        self._write(b"".join(parts))
+
+    def turn(self, seat, move, delta, why, thoughts):
+        whyId = self._intern(why)
+        ids = [self._intern(str(t)) for t in thoughts]
+        self._write(TURN.pack(TAG_TURN, seat, MOVE_CODES[move], delta, whyId, len(ids))
+                    + b"".join(U32.pack(i) for i in ids))
+
+    def npc(self, steps):
+        # steps: (dx, dy) each red actually moved this phase, in board.reds order
+        self._write(COUNT.pack(TAG_NPC, len(steps)) + bytes(STEP_CODES[s] for s in steps))
+
+    def tickEnd(self, sim):
+        if sim.tick % self.keyframeEvery == 0:
+            self.keyframe(sim)
+
+    def close(self):
+        if self.fh is None:
+            return
+        indexAt = self.pos
+        parts = [bytes((TAG_INDEX,)), U32.pack(len(self.keyframes))]
+        parts += [KEY_INDEX.pack(t, off) for t, off in self.keyframes]
+        parts.append(U32.pack(len(self.stringOffsets)))
+        parts += [U64.pack(off) for off in self.stringOffsets]
+        parts.append(TRAILER.pack(indexAt, TRAILER_MAGIC))
+        self._write(b"".join(parts))
+        self.fh.close()
+        self.fh = None
+
+class ReplayState:
+    """Board contents at the start of a turn: players as [x, y, score], greens, reds as [x, y]."""
+    def __init__(self, tick, activeIdx, players, greens, reds):
+        self.tick = tick
+        self.activeIdx = activeIdx
+        self.players = players
+        self.greens = greens
+        self.reds = reds
+
+class ReplayTurn:
+    def __init__(self, reader, tick, seat, move, delta, whyId, thoughtIds):
+        self.reader = reader
+        self.tick = tick
+        self.seat = seat
+        self.agentId = reader.seats[seat][0]
+        self.move = move
+        self.delta = delta
+        self.whyId = whyId
+        self.thoughtIds = thoughtIds
+
+    @property
+    def why(self):
+        return self.reader.string(self.whyId)
+
+    @property
+    def thoughts(self):
+        return [self.reader.string(i) for i in self.thoughtIds]
+
+    def header(self):
+        return f"move={self.move} | why={self.why} | Δscore={self.delta:+d}"
+
+class ReplayReader:
+    """
+    Memory-maps a replay. stateAt(tick) jumps to the keyframe at or before `tick` through
+    the index and replays at most keyframeEvery ticks forward; strings are decoded on demand.
+    """
+    def __init__(self, path):
+        self.fh = open(path, "rb")
+        self.mm = mmap.mmap(self.fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.seed, self.npcSeed, self.w, self.h, self.keyframeEvery, self.sightRange, n = \
+            HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} GeomLab replay")
+        pos = HEADER.size
+        self.seats = []
+        for _ in range(n):
+            size, shape, r, g, b = SEAT.unpack_from(self.mm, pos)
+            pos += SEAT.size
+            self.seats.append((bytes(self.mm[pos:pos + size]).decode("utf-8"), (r, g, b), SHAPES[shape]))
+            pos += size
+        green, red = SCORE_VALUES.unpack_from(self.mm, pos)
+        self.scoreValues = {"GREEN": green, "RED": red}
+        self.dataStart = pos + SCORE_VALUES.size
+        self.complete = self._readIndex()
+        if not self.complete:
+            self._scanIndex()
+
+    def close(self):
+        self.mm.close()
+        self.fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- Index ----------
+    def _readIndex(self):
+        mm = self.mm
+        if len(mm) < self.dataStart + TRAILER.size:
+            return False
+        indexAt, magic = TRAILER.unpack_from(mm, len(mm) - TRAILER.size)
+        if magic != TRAILER_MAGIC or mm[indexAt] != TAG_INDEX:
+            return False
+        pos = indexAt + 1
+        (nk,) = U32.unpack_from(mm, pos)
+        pos += U32.size
+        self.keyframes = [KEY_INDEX.unpack_from(mm, pos + i * KEY_INDEX.size) for i in range(nk)]
+        pos += nk * KEY_INDEX.size
+        (ns,) = U32.unpack_from(mm, pos)
+        pos += U32.size
+        self.stringOffsets = list(struct.unpack_from(f"<{ns}Q", mm, pos))
+        self.dataEnd = indexAt
+        return True
+
+    def _scanIndex(self):
+        # No footer: walk the records, stopping at the first incomplete one
+        self.keyframes = []
+        self.stringOffsets = []
+        pos = self.dataStart
+        end = len(self.mm)
+        while pos < end:
+            tag = self.mm[pos]
+            try:
+                nxt = self._skip(pos)
+            except struct.error:
+                break
+            if nxt > end or tag == TAG_INDEX:
+                break
+            if tag == TAG_STRING:
+                self.stringOffsets.append(pos)
+            elif tag == TAG_KEYFRAME:
+                self.keyframes.append((KEYFRAME.unpack_from(self.mm, pos)[1], pos))
+            pos = nxt
+        self.dataEnd = pos
+
+    def _skip(self, pos):
+        # Offset of the record after the one at `pos`
+        mm = self.mm
+        tag = mm[pos]
+        if tag == TAG_STRING:
+            return pos + 1 + U32.size + U32.unpack_from(mm, pos + 1)[0]
+        if tag == TAG_TURN:
+            return pos + TURN.size + 4 * TURN.unpack_from(mm, pos)[5]
+        if tag == TAG_NPC:
+            return pos + COUNT.size + COUNT.unpack_from(mm, pos)[1]
+        if tag == TAG_KEYFRAME:
+            pos += KEYFRAME.size + PLAYER.size * len(self.seats)
+            pos += U32.size + CELL.size * U32.unpack_from(mm, pos)[0]
+            return pos + U32.size + CELL.size * U32.unpack_from(mm, pos)[0]
+        if tag == TAG_INDEX:
+            return len(mm)
+        raise ValueError(f"Corrupt replay: unknown record tag {tag} at offset {pos}")
+
+    # ---------- Lookup ----------
+    def string(self, sid):
+        pos = self.stringOffsets[sid]
+        (size,) = U32.unpack_from(self.mm, pos + 1)
+        start = pos + 1 + U32.size
+        return bytes(self.mm[start:start + size]).decode("utf-8")
+
+    @property
+    def lastTick(self):
+        # Highest tick whose start is in the file
+        state = self._stateFrom(len(self.keyframes) - 1, None)
+        return state.tick
+
+    def _keyframeState(self, pos):
+        mm = self.mm
+        _, tick, activeIdx = KEYFRAME.unpack_from(mm, pos)
+        pos += KEYFRAME.size
+        players = []
+        for _ in self.seats:
+            players.append(list(PLAYER.unpack_from(mm, pos)))
+            pos += PLAYER.size
+        (ng,) = U32.unpack_from(mm, pos)
+        pos += U32.size
+        flat = struct.unpack_from(f"<{2 * ng}H", mm, pos)
+        greens = set(zip(flat[::2], flat[1::2]))
+        pos += ng * CELL.size
+        (nr,) = U32.unpack_from(mm, pos)
+        pos += U32.size
+        flat = struct.unpack_from(f"<{2 * nr}H", mm, pos)
+        reds = [[x, y] for x, y in zip(flat[::2], flat[1::2])]
+        return ReplayState(tick, activeIdx, players, greens, reds), pos + nr * CELL.size
+
+    def _records(self, pos):
+        # (tag, offset) from `pos` to the end of the data
+        while pos < self.dataEnd:
+            yield self.mm[pos], pos
+            pos = self._skip(pos)
+
+    def _apply(self, state, tag, pos):
+        mm = self.mm
+        if tag == TAG_TURN:
+            _, seat, code, delta, _, _ = TURN.unpack_from(mm, pos)
+            p = state.players[seat]
+            dx, dy = STEPS[code]
+            p[0] = min(max(p[0] + dx, 0), self.w - 1)
+            p[1] = min(max(p[1] + dy, 0), self.h - 1)
+            state.greens.discard((p[0], p[1]))
+            p[2] += delta
+            state.activeIdx = (seat + 1) % len(self.seats)
+            if state.activeIdx == 0:
+                state.tick += 1
+        elif tag == TAG_NPC:
+            (_, n) = COUNT.unpack_from(mm, pos)
+            codes = mm[pos + COUNT.size:pos + COUNT.size + n]
+            for red, code in zip(state.reds, codes):
+                dx, dy = STEPS[code]
+                red[0] += dx
+                red[1] += dy
+
+    def _stateFrom(self, k, tick):
+        # Replay forward from keyframe k until `tick` starts (None = to the end)
+        state, pos = self._keyframeState(self.keyframes[k][1])
+        for tag, at in self._records(pos):
+            if tick is not None and state.tick >= tick and state.activeIdx == 0 and tag != TAG_NPC:
+                break
+            if tag == TAG_KEYFRAME:
+                continue
+            self._apply(state, tag, at)
+        return state
+
+    def stateAt(self, tick):
+        """State at the start of `tick` (clamped to the recorded range)."""
+        if not self.keyframes:
+            raise ValueError("Replay has no keyframes")
+        # Keyframes are evenly spaced, so the right one is found by division
+        k = min(max(tick, 0) // self.keyframeEvery, len(self.keyframes) - 1)
+        while k > 0 and self.keyframes[k][0] > tick:
+            k -= 1
+        return self._stateFrom(k, max(tick, 0))
+
+    def turns(self, fromTick=0, toTick=None):
+        """ReplayTurn records for ticks in [fromTick, toTick)."""
+        k = min(max(fromTick, 0) // self.keyframeEvery, len(self.keyframes) - 1)
+        tick, pos = self.keyframes[k]
+        for tag, at in self._records(pos):
+            if tag != TAG_TURN:
+                continue
+            _, seat, code, delta, whyId, n = TURN.unpack_from(self.mm, at)
+            if toTick is not None and tick >= toTick:
+                return
+            if tick >= fromTick:
+                ids = struct.unpack_from(f"<{n}I", self.mm, at + TURN.size)
+                yield ReplayTurn(self, tick, seat, MOVES[code], delta, whyId, ids)
+            if seat == len(self.seats) - 1:
+                tick += 1
+
+    def board(self, tick):
+        """A Board (players without controllers) showing the start of `tick`, for the renderer."""
+        state = self.stateAt(tick)
+        board = Board(self.w, self.h, self.scoreValues)
+        for (agentId, color, shape), (x, y, score) in zip(self.seats, state.players):
+            p = Player(agentId, color, None, shape)
+            p.score = score
+            board.addPlayer(p, x, y)
+        board.greens.update(state.greens)
+        for x, y in state.reds:
+            board.addRed(RedNPC(x, y))
+        return board, state
@@ -0,0 +1,67 @@
+# Simultaneous-move rounds: every agent's decide() for one round, run concurrently
+
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+
+def fallback(why, detail):
+    return {"move": "STAY", "why": why, "thoughts": [detail]}
+
+def timedDecide(controller, obs):
+    # (decision, seconds) — runs on a worker thread
+    t0 = time.perf_counter()
+    try:
+        decision = controller.decide(obs)
+    except Exception as e:
+        decision = fallback("Controller error", f"{type(e).__name__}: {e}")
+    return decision, time.perf_counter() - t0
+
+def decideRemote(controller, obs):
+    # Process-pool variant: ship the controller back so state it keeps (RNG, history) survives
+    decision, seconds = timedDecide(controller, obs)
+    return decision, seconds, controller
+
+class RoundDecider:
+    """
+    Runs one round of decide() calls concurrently, so a round costs about the slowest
+    controller instead of the sum. Controllers with `cpuBound = True` (tree search) go to a
+    process pool when `processes` > 0; everything else (LLM calls, heuristics, humans) runs
+    on threads. Answers missing after `timeout` seconds become STAY; their calls keep running
+    and are dropped.
+    """
+    def __init__(self, threads=8, processes=0):
+        self.threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="round")
+        self.processes = ProcessPoolExecutor(max_workers=processes) if processes else None
+
+    def decideAll(self, players, observations, timeout=None, telemetry=None):
+        futures = []
+        for p, obs in zip(players, observations):
+            if self.processes is not None and getattr(p.controller, "cpuBound", False):
+                futures.append((p, True, self.processes.submit(decideRemote, p.controller, obs)))
+            else:
+                futures.append((p, False, self.threads.submit(timedDecide, p.controller, obs)))
+        wait([f for _, _, f in futures], timeout=timeout)
+
+        decisions = []
+        for p, remote, fut in futures:
+            if not fut.done():
+                fut.cancel()
+                decisions.append(fallback("Decision deadline exceeded", f"No answer within {timeout:.1f} s"))
+                continue
+            try:
+                result = fut.result()
+            except Exception as e:  # e.g. a controller that cannot be pickled
+                decisions.append(fallback("Controller error", f"{type(e).__name__}: {e}"))
+                continue
+            if remote:
+                decision, seconds, p.controller = result
+            else:
+                decision, seconds = result
+            if telemetry is not None:
+                telemetry.record("decide", p.agentId, seconds)
+            decisions.append(decision)
+        return decisions
+
+    def close(self):
+        self.threads.shutdown(wait=False, cancel_futures=True)
+        if self.processes is not None:
+            self.processes.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,274 @@
+# Headless simulation core: board, turn order and NPC phase (no pygame, no pacing)
+
+import math
+import random
+from settings import GRID_W, GRID_H, SCORES, NUM_GREENS, NUM_REDS
+from engine.board import Board
+from engine.entities import Player
+from engine.vision import extractObservation, extractCompactObservation, IncrementalObserver
+from engine.logger import ThoughtsLogger
+from engine.config import MatchConfig, SEATS, DEFAULT_SEED, seatIdentity
+
+VALID_MOVES = {"UP", "DOWN", "LEFT", "RIGHT", "STAY"}
+
+def spawnPoints(w, h, n=len(SEATS)):
+    # Corner spawns for the standard seats; larger line-ups are spread on an even lattice
+    if n <= len(SEATS):
+        return [(2, 2), (w - 3, 2), (2, h - 3)][:n]
+    if n > w * h:
+        raise ValueError(f"A {w}x{h} board has no room for {n} players")
+    cols = min(w, max(1, math.ceil(math.sqrt(n * w / h))))
+    rows = math.ceil(n / cols)
+    if rows > h:
+        cols = math.ceil(n / h)
+        rows = math.ceil(n / cols)
+    return [((2 * (i % cols) + 1) * w // (2 * cols), (2 * (i // cols) + 1) * h // (2 * rows)) for i in range(n)]
+
+def seatPlayers(controllers):
+    # Wrap controllers into Players on the standard seats (generated seats beyond them)
+    players = []
+    for i, ctrl in enumerate(controllers):
+        agentId, color, shape = seatIdentity(i)
+        players.append(Player(agentId, color, ctrl, shape))
+    return players
+
+def setupBoard(players, seed=DEFAULT_SEED, w=GRID_W, h=GRID_H, numGreens=NUM_GREENS, numReds=NUM_REDS, scores=SCORES):
+    # Seeded initial state: players on their spawn points, then greens, then reds
+    board = Board(w, h, scores, seed)
+    for p, (x, y) in zip(players, spawnPoints(w, h, len(players))):
+        board.addPlayer(p, x, y)
+    board.spawnGreens(numGreens)
+    board.spawnReds(numReds)
+    return board
+
+class Simulation:
+    def __init__(self, players, seed=None, npcSeed=None, recorder=None, telemetry=None, config=None, decider=None,
+                 logger=None):
+        # Board size, counts and rules come from `config` (MatchConfig(); the standard game by default);
+        # seed/npcSeed, when given, override its seeds
+        config = config or MatchConfig()
+        if seed is not None or npcSeed is not None:
+            config = config.copy(seed=config.seed if seed is None else seed, npcSeed=npcSeed)
+        self.config = config
+        self.seed = config.seed
+        self.npcSeed = config.npcSeed
+
+        # Pass a ThoughtsLogger with a LogSink to stream every entry to disk
+        self.logger = logger or ThoughtsLogger()
+        self.tick = 0
+
+        self.board = setupBoard(players, config.seed, config.w, config.h, config.numGreens, config.numReds,
+                                config.scores)
+
+        self.turnOrder = list(players)
+        self.activeIdx = 0
+
+        self.redRng = random.Random(config.npcSeed)
+        # Vectorized NPC phase: NumPy Generator seeded the same way (different paths than redRng)
+        self.npcGen = None
+        if config.npcMode == "vectorized":
+            import numpy as np
+            self.npcGen = np.random.default_rng(config.npcSeed)
+
+        # Optional ReplayRecorder (engine.replay); gets the initial state, every turn and NPC phase
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.begin(self)
+
+        # Optional Telemetry (engine.telemetry): per-phase timings; None keeps the hot path untouched
+        self.telemetry = telemetry
+
+        # Simultaneous mode: optional RoundDecider (engine.rounds) running a round's decide() calls
+        # concurrently; without one they run one after another on the same snapshot
+        self.simultaneous = config.turnMode == "simultaneous"
+        self.decider = decider
+
+        # Sequential mode: hand the next agent its upcoming observation as soon as the previous
+        # move (and NPC phase) is applied, for controllers with prefetch() (speculative LLM calls)
+        self.speculate = False
+
+        # Dict observations from per-player IncrementalObservers (patched by board change events)
+        # instead of a fresh sweep of the sight diamond; same content, cheaper with large sight ranges
+        self.incremental = False
+        self.observers = {}
+
+    @classmethod
+    def fromConfig(cls, config, **kwargs):
+        # Players and controllers built from config.agents through the controller registry
+        return cls(config.createPlayers(), config=config, **kwargs)
+
+    def activePlayer(self):
+        return self.turnOrder[self.activeIdx]
+
+    def gameEnded(self):
+        return len(self.board.greens) == 0 or self.tick >= self.config.maxRounds
+
+    def moveReds(self):
+        if self.npcGen is None:
+            self.board.npcPhase(self.redRng, self.config.redMoveProb)
+        else:
+            self.board.npcPhaseVectorized(self.npcGen, self.config.redMoveProb)
+
+    def npcPhase(self):
+        if self.recorder is None:
+            self.moveReds()
+            return
+        reds = self.board.reds
+        before = list(reds.positions())
+        self.moveReds()
+        self.recorder.npc([(x - bx, y - by) for (x, y), (bx, by) in zip(reds.positions(), before)])
+
+    def waitingForInput(self):
+        # Human-style controllers expose has_move(); their turn (or, simultaneous, the round) blocks until a move is queued
+        players = self.turnOrder if self.simultaneous else (self.activePlayer(),)
+        return any(hasattr(p.controller, "has_move") and not p.controller.has_move() for p in players)
+
+    def observe(self, p=None):
+        p = p or self.activePlayer()
+        if getattr(p.controller, "compactObservation", False):
+            return extractCompactObservation(self.board, p, self.tick, self.config.sightRange)
+        if self.incremental:
+            observer = self.observers.get(p.agentId)
+            if observer is None:
+                observer = self.observers[p.agentId] = IncrementalObserver(self.board, p, self.config.sightRange)
+            return observer.observe(self.tick)
+        return extractObservation(self.board, p, self.tick, self.config.sightRange)
+
+    def stepTurn(self):
+        # Returns False (and does not advance) while the active agent waits for input
+        if self.waitingForInput():
+            return False
+        if self.simultaneous:
+            self.applyRound(self.decideRound(self.observeRound()))
+            return True
+        p = self.activePlayer()
+        tel = self.telemetry
+        if tel is None:
+            decision = p.controller.decide(self.observe())
+        else:
+            t0 = tel.clock()
+            obs = self.observe()
+            t1 = tel.clock()
+            decision = p.controller.decide(obs)
+            tel.record("observe", p.agentId, t1 - t0)
+            tel.record("decide", p.agentId, tel.clock() - t1)
+        self.applyDecision(decision)
+        return True
+
+    # ---------- Simultaneous mode ----------
+    def observeRound(self):
+        # Every agent sees the state at the start of the round
+        tel = self.telemetry
+        if tel is None:
+            return [self.observe(p) for p in self.turnOrder]
+        observations = []
+        for p in self.turnOrder:
+            t0 = tel.clock()
+            observations.append(self.observe(p))
+            tel.record("observe", p.agentId, tel.clock() - t0)
+        return observations
+
+    def decideRound(self, observations, timeout=None):
+        if self.decider is not None:
+            return self.decider.decideAll(self.turnOrder, observations, timeout, self.telemetry)
+        tel = self.telemetry
+        decisions = []
+        for p, obs in zip(self.turnOrder, observations):
+            t0 = tel.clock() if tel is not None else 0
+            decisions.append(p.controller.decide(obs))
+            if tel is not None:
+                tel.record("decide", p.agentId, tel.clock() - t0)
+        return decisions
+
+    def applyRound(self, decisions):
+        # Moves resolve in seat order, so when several agents step onto the same green
+        # the earliest seat collects it; the rest only pay for reds. Then the NPC phase runs.
+        if self.activeIdx != 0:
+            raise RuntimeError("applyRound() needs the round to start at seat 0")
+        for decision in decisions:
+            self.applyDecision(decision)
+
+    def applyDecision(self, decision):
+        p = self.activePlayer()
+
+        move = decision.get("move", "STAY")
+        why = decision.get("why", "")
+        thoughts = decision.get("thoughts", [])
+
+        # Validate move
+        if move not in VALID_MOVES:
+            thoughts = list(thoughts) + [f"Invalid move '{move}', switching to STAY"]
+            move = "STAY"
+
+        # Apply + compute outcome
+        prevScore = p.score
+        tel = self.telemetry
+        if tel is None:
+            p.applyMove(self.board, move)
+        else:
+            t0 = tel.clock()
+            p.applyMove(self.board, move)
+            tel.record("apply", p.agentId, tel.clock() - t0)
+        delta = p.score - prevScore
+
+        # Allow agent to learn from outcome
+        if hasattr(p.controller, "postOutcome"):
+            try:
+                p.controller.postOutcome(self.tick, decision, delta)
+            except Exception:
+                # don't crash the game if an agent fails to log
+                pass
+
+        # Log thoughts
+        header = f"move={move} | why={why} | Δscore={delta:+d}"
+        self.logger.append(p.agentId, header, thoughts, self.tick)
+        if self.recorder is not None:
+            self.recorder.turn(self.activeIdx, move, delta, why, thoughts)
+
+        # Next turn
+        self.activeIdx = (self.activeIdx + 1) % len(self.turnOrder)
+        if self.activeIdx == 0:
+            if tel is None:
+                self.npcPhase()
+            else:
+                t0 = tel.clock()
+                self.npcPhase()
+                tel.record("npc", "-", tel.clock() - t0)
+            self.tick += 1
+            if self.recorder is not None:
+                self.recorder.tickEnd(self)
+
+        if self.speculate and not self.simultaneous and not self.gameEnded():
+            nxt = self.activePlayer()
+            prefetch = getattr(nxt.controller, "prefetch", None)
+            if prefetch is not None:
+                prefetch(self.observe(nxt))
+
+    def snapshot(self):
+        # Restore point for lookahead over the whole match (board, turn state and NPC RNG)
+        genState = self.npcGen.bit_generator.state if self.npcGen is not None else None
+        return (self.board.snapshot(self.redRng), self.tick, self.activeIdx, genState)
+
+    def restore(self, snap):
+        boardSnap, self.tick, self.activeIdx, genState = snap
+        self.board.restore(boardSnap, self.redRng)
+        if genState is not None:
+            self.npcGen.bit_generator.state = genState
+
+    def step(self):
+        # One decision as fast as the controller allows; False once nothing can advance
+        if self.gameEnded():
+            return False
+        return self.stepTurn()
+
+    def runToEnd(self):
+        while self.step():
+            pass
+        return self.results()
+
+    def results(self):
+        return {
+            "scores": {p.agentId: p.score for p in self.turnOrder},
+            "ticks": self.tick,
+            "remainingGreens": len(self.board.greens),
+        }
@@ -0,0 +1,168 @@
+# Turn/frame timing histograms with JSONL and Prometheus text export
+
+import bisect
+import json
+import os
+import threading
+import time
+
+# Bucket upper bounds in seconds: 10 µs doubling up to ~84 s
+BUCKETS = [1e-5 * 2 ** i for i in range(24)]
+OVERLAY_AGENTS = 6  # per-agent overlay lines: the slowest deciders only, so large line-ups fit the panel
+
+class Histogram:
+    """Fixed log-spaced buckets; quantiles are interpolated inside the matching bucket."""
+    __slots__ = ("counts", "count", "total", "last", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot = +Inf
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = BUCKETS[i - 1] if i > 0 else 0.0
+                hi = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "last": self.last,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+class Telemetry:
+    """
+    Per-(phase, agent) latency histograms plus controller counters.
+    Phases recorded by the engine: observe, decide, apply, npc (Simulation), wait, render, frame (Game).
+    Callers keep a `telemetry` attribute that is None when disabled, so the off path is one check.
+    record() is called from decision worker threads too; `lock` guards the histogram table, and the
+    exporters iterate over a copy taken under it.
+    """
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def record(self, phase, agent, seconds):
+        with self.lock:
+            h = self.histograms.get((phase, agent))
+            if h is None:
+                h = self.histograms[(phase, agent)] = Histogram()
+            h.add(seconds)
+
+    def items(self):
+        # Sorted ((phase, agent), histogram) pairs, safe to walk while workers keep recording
+        with self.lock:
+            return sorted(self.histograms.items())
+
+    def collect(self, players):
+        # Pull numeric counters from controllers that expose stats() (e.g. LLM retries)
+        for p in players:
+            stats = getattr(p.controller, "stats", None)
+            if stats is None:
+                continue
+            for name, value in stats().items():
+                if isinstance(value, (int, float)):
+                    with self.lock:
+                        self.counters[(p.agentId, name)] = value
+
+    def counterItems(self):
+        with self.lock:
+            return sorted(self.counters.items())
+
+    def snapshot(self, **extra):
+        doc = {"time": time.time(), "uptime": time.time() - self.started}
+        doc.update(extra)
+        doc["phases"] = {f"{phase}/{agent}": h.summary() for (phase, agent), h in self.items()}
+        doc["counters"] = {f"{agent}/{name}": v for (agent, name), v in self.counterItems()}
+        return doc
+
+    def writeJsonl(self, path, **extra):
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(self.snapshot(**extra)) + "\n")
+
+    def writePrometheus(self, path):
+        # Text exposition format; written to a temp file and renamed so scrapers never see half a file
+        lines = [
+            "# HELP geomlab_phase_seconds Time spent in each turn/frame phase.",
+            "# TYPE geomlab_phase_seconds histogram",
+        ]
+        for (phase, agent), h in self.items():
+            labels = f'phase="{phase}",agent="{agent}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h.counts):
+                cumulative += n
+                lines.append(f'geomlab_phase_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'geomlab_phase_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+            lines.append(f"geomlab_phase_seconds_sum{{{labels}}} {h.total:.9f}")
+            lines.append(f"geomlab_phase_seconds_count{{{labels}}} {h.count}")
+        counters = self.counterItems()
+        if counters:
+            lines.append("# HELP geomlab_controller_stat Counters reported by controllers (LLM requests, retries, ...).")
+            lines.append("# TYPE geomlab_controller_stat gauge")
+            for (agent, name), v in counters:
+                lines.append(f'geomlab_controller_stat{{agent="{agent}",stat="{name}"}} {v}')
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+
+    def overlayLines(self):
+        # Short text for the side panel: frame timing, then decide latency and LLM counters for
+        # at most OVERLAY_AGENTS agents (slowest p99 first), with a count of the rest
+        lines = []
+        frame = self.histograms.get(("frame", "-"))
+        render = self.histograms.get(("render", "-"))
+        if frame and frame.count:
+            p50 = frame.quantile(0.50)
+            fps = 1.0 / p50 if p50 else 0.0
+            lines.append(f"frame p50 {p50 * 1e3:.1f} ms ({fps:.0f} fps)  p99 {frame.quantile(0.99) * 1e3:.1f} ms")
+        if render and render.count:
+            lines.append(f"render p50 {render.quantile(0.50) * 1e3:.2f} ms  p99 {render.quantile(0.99) * 1e3:.2f} ms")
+        decides = sorted(((h.quantile(0.99), agent, h) for (phase, agent), h in self.items() if phase == "decide"),
+                         key=lambda d: -d[0])
+        for p99, agent, h in decides[:OVERLAY_AGENTS]:
+            lines.append(f"{agent:<9} decide p50 {h.quantile(0.50) * 1e3:.1f}  p95 {h.quantile(0.95) * 1e3:.1f}"
+                         f"  p99 {p99 * 1e3:.1f} ms")
+        if len(decides) > OVERLAY_AGENTS:
+            lines.append(f"  +{len(decides) - OVERLAY_AGENTS} more agents deciding")
+        counterItems = self.counterItems()
+        counters = dict(counterItems)
+        llmLines = []
+        for (agent, name), v in counterItems:
+            if name == "retries":
+                llmLines.append(f"{agent:<9} llm retries {v}")
+            elif name == "prefetch_hits":
+                misses = counters.get((agent, "prefetch_misses"), 0)
+                saved = counters.get((agent, "prefetch_saved_s"), 0.0)
+                llmLines.append(f"{agent:<9} prefetch {v} hit / {misses} miss, {saved:.1f} s hidden")
+        lines.extend(llmLines[:OVERLAY_AGENTS])
+        if len(llmLines) > OVERLAY_AGENTS:
+            lines.append(f"  +{len(llmLines) - OVERLAY_AGENTS} more LLM counter lines")
+        return lines
@@ -1,7 +1,7 @@
 # Fog-limited observation extraction
 
 from settings import SIGHT_RANGE
-from engine.geometry import manhattan
+from engine.geometry import diamondOffsets
 
 # Tile tags
 EMPTY = "EMPTY"
@@ -9,38 +9,279 @@ GREEN = "GREEN"
 RED = "RED"
 PLAYER = "PLAYER"
 
-def extractObservation(board, activePlayer, tick):
+# Compact tile codes for array observations
+TILE_EMPTY = 0
+TILE_GREEN = 1
+TILE_RED = 2
+TILE_PLAYER = 3
+TILE_HIDDEN = 255  # outside the sight diamond or off the board
+TILE_TAGS = {TILE_GREEN: GREEN, TILE_RED: RED, TILE_PLAYER: PLAYER}
+
+MOVE_SET = ["UP", "DOWN", "LEFT", "RIGHT", "STAY"]
+
+def extractObservation(board, activePlayer, tick, sightRange=SIGHT_RANGE):
     sx, sy = activePlayer.x, activePlayer.y
+    w, h = board.w, board.h
     vision = []
-    for y in range(board.h):
-        for x in range(board.w):
-            if manhattan((sx, sy), (x, y)) <= SIGHT_RANGE:
-                tag, meta = classify(board, x, y)
-                if tag != EMPTY:
-                    item = {"x": x, "y": y, "t": tag}
-                    if tag == PLAYER:
-                        item["id"] = meta  # agentId
-                    vision.append(item)
+    # Walk only the sight diamond; cost scales with sight area, not board size
+    for dx, dy in diamondOffsets(sightRange):
+        x, y = sx + dx, sy + dy
+        if 0 <= x < w and 0 <= y < h:
+            tag, meta = classify(board, x, y)
+            if tag != EMPTY:
+                item = {"x": x, "y": y, "t": tag}
+                if tag == PLAYER:
+                    item["id"] = meta  # agentId
+                vision.append(item)
 
     obs = {
         "tick": tick,
         "self": {"id": activePlayer.agentId, "pos": {"x": sx, "y": sy}, "score": activePlayer.score},
         "vision": vision,
         "bounds": {"w": board.w, "h": board.h},
-        "rules": {"sight": SIGHT_RANGE, "moveSet": ["UP", "DOWN", "LEFT", "RIGHT", "STAY"]},
+        "rules": {"sight": sightRange, "moveSet": list(MOVE_SET)},
         "stats": {"remainingGreens": len(board.greens)}
     }
     return obs
 
+_windowCells = {}
+
+def windowCells(r):
+    # (dx, dy, index into the (2r+1)^2 window) for each cell of the sight diamond, row-major
+    cells = _windowCells.get(r)
+    if cells is None:
+        side = 2 * r + 1
+        cells = tuple((dx, dy, (dy + r) * side + (dx + r)) for dx, dy in diamondOffsets(r))
+        _windowCells[r] = cells
+    return cells
+
+class CompactObservation:
+    """
+    Array-backed observation: a (2r+1)^2 row-major tile window (bytearray of TILE_* codes,
+    TILE_HIDDEN outside sight) centred on the agent, plus per-type coordinate lists in
+    vision order. Dict-style access (obs["vision"], obs["self"], ...) builds the regular
+    observation lazily, once, for controllers that still need it.
+    """
+    __slots__ = ("tick", "agentId", "x", "y", "score", "w", "h", "sight", "remainingGreens",
+                 "window", "greens", "reds", "players", "_dict")
+
+    def __init__(self, tick, agentId, x, y, score, w, h, sight, remainingGreens, window, greens, reds, players):
+        self.tick = tick
+        self.agentId = agentId
+        self.x, self.y = x, y
+        self.score = score
+        self.w, self.h = w, h
+        self.sight = sight
+        self.remainingGreens = remainingGreens
+        self.window = window
+        self.greens = greens    # [(x, y), ...]
+        self.reds = reds        # [(x, y), ...]
+        self.players = players  # [(agentId, x, y), ...], self included
+        self._dict = None
+
+    def tileAt(self, x, y):
+        r = self.sight
+        dx, dy = x - self.x, y - self.y
+        if abs(dx) + abs(dy) > r:
+            return TILE_HIDDEN
+        return self.window[(dy + r) * (2 * r + 1) + (dx + r)]
+
+    def asDict(self):
+        if self._dict is None:
+            ids = {(x, y): agentId for agentId, x, y in self.players}
+            vision = []
+            for dx, dy, i in windowCells(self.sight):
+                code = self.window[i]
+                if code != TILE_EMPTY and code != TILE_HIDDEN:
+                    x, y = self.x + dx, self.y + dy
+                    item = {"x": x, "y": y, "t": TILE_TAGS[code]}
+                    if code == TILE_PLAYER:
+                        item["id"] = ids[(x, y)]
+                    vision.append(item)
+            self._dict = {
+                "tick": self.tick,
+                "self": {"id": self.agentId, "pos": {"x": self.x, "y": self.y}, "score": self.score},
+                "vision": vision,
+                "bounds": {"w": self.w, "h": self.h},
+                "rules": {"sight": self.sight, "moveSet": list(MOVE_SET)},
+                "stats": {"remainingGreens": self.remainingGreens}
+            }
+        return self._dict
+
+    def __getitem__(self, key):
+        return self.asDict()[key]
+
+    def get(self, key, default=None):
+        return self.asDict().get(key, default)
+
+def extractCompactObservation(board, activePlayer, tick, sightRange=SIGHT_RANGE):
+    sx, sy = activePlayer.x, activePlayer.y
+    w, h = board.w, board.h
+    r = sightRange
+    window = bytearray([TILE_HIDDEN]) * ((2 * r + 1) ** 2)
+    greens, reds, players = [], [], []
+    playerCells, redCells, greenSet = board.playerCells, board.redCells, board.greens
+    for dx, dy, i in windowCells(r):
+        x, y = sx + dx, sy + dy
+        if 0 <= x < w and 0 <= y < h:
+            cell = (x, y)
+            # Priority: players, reds, greens (as in classify)
+            occupants = playerCells.get(cell)
+            if occupants:
+                window[i] = TILE_PLAYER
+                players.append((occupants[0].agentId, x, y))
+            elif cell in redCells:
+                window[i] = TILE_RED
+                reds.append(cell)
+            elif cell in greenSet:
+                window[i] = TILE_GREEN
+                greens.append(cell)
+            else:
+                window[i] = TILE_EMPTY
+    return CompactObservation(tick, activePlayer.agentId, sx, sy, activePlayer.score, w, h, r,
+                              len(greenSet), window, greens, reds, players)
+
+_edges = {}
+
+def edgeOffsets(r, ux, uy):
+    # Rim of the sight diamond facing (ux, uy): the cells a one-step shift that way brings into sight
+    key = (r, ux, uy)
+    offs = _edges.get(key)
+    if offs is None:
+        offs = tuple((dx, dy) for dx, dy in diamondOffsets(r) if abs(dx) + abs(dy) == r and dx * ux + dy * uy >= 0)
+        _edges[key] = offs
+    return offs
+
+class IncrementalObserver:
+    """
+    extractObservation for one player, kept up to date instead of rebuilt. The non-empty cells in
+    sight are cached; Board change events mark the cached cells to re-check, and when the player
+    moves only the rims of the sight diamond are swept. observe() then costs about the number of
+    changes plus the number of visible items, instead of the sight area.
+    Call close() to stop listening when the observer is dropped.
+    """
+    def __init__(self, board, player, sightRange=SIGHT_RANGE):
+        self.board = board
+        self.player = player
+        self.sight = sightRange
+        self.visible = {}     # (x, y) -> (tag, meta) for non-empty cells in sight
+        self.pending = set()  # cells in sight whose occupants changed since the last observe()
+        self.cx = self.cy = None
+        self.rebuilds = 0
+        board.addListener(self.onChange)
+
+    def onChange(self, x, y):
+        if self.cx is not None and abs(x - self.cx) + abs(y - self.cy) <= self.sight:
+            self.pending.add((x, y))
+
+    def close(self):
+        self.board.removeListener(self.onChange)
+
+    def rebuild(self):
+        board, visible = self.board, {}
+        sx, sy = self.cx, self.cy = self.player.x, self.player.y
+        w, h = board.w, board.h
+        for dx, dy in diamondOffsets(self.sight):
+            x, y = sx + dx, sy + dy
+            if 0 <= x < w and 0 <= y < h:
+                item = classify(board, x, y)
+                if item[0] != EMPTY:
+                    visible[(x, y)] = item
+        self.visible = visible
+        self.pending.clear()
+        self.rebuilds += 1
+
+    def shift(self, ux, uy):
+        # Move the cached diamond one cell: drop the trailing rim, classify the leading one
+        board, visible, r = self.board, self.visible, self.sight
+        cx, cy = self.cx, self.cy
+        for dx, dy in edgeOffsets(r, -ux, -uy):
+            visible.pop((cx + dx, cy + dy), None)
+        cx, cy = self.cx, self.cy = cx + ux, cy + uy
+        w, h = board.w, board.h
+        for dx, dy in edgeOffsets(r, ux, uy):
+            x, y = cx + dx, cy + dy
+            if 0 <= x < w and 0 <= y < h:
+                item = classify(board, x, y)
+                if item[0] != EMPTY:
+                    visible[(x, y)] = item
+
+    def sync(self):
+        p, r = self.player, self.sight
+        if self.cx is None or abs(p.x - self.cx) + abs(p.y - self.cy) > max(1, r // 2):
+            self.rebuild()
+            return
+        while self.cx != p.x:
+            self.shift(1 if p.x > self.cx else -1, 0)
+        while self.cy != p.y:
+            self.shift(0, 1 if p.y > self.cy else -1)
+        if self.pending:
+            board, visible = self.board, self.visible
+            sx, sy = self.cx, self.cy
+            for x, y in self.pending:
+                item = classify(board, x, y) if abs(x - sx) + abs(y - sy) <= r else (EMPTY, None)
+                if item[0] != EMPTY:
+                    visible[(x, y)] = item
+                else:
+                    visible.pop((x, y), None)
+            self.pending.clear()
+
+    def observe(self, tick):
+        self.sync()
+        p, board = self.player, self.board
+        vision = []
+        # Row-major diamond order, as extractObservation walks it
+        for x, y in sorted(self.visible, key=lambda c: (c[1], c[0])):
+            tag, meta = self.visible[(x, y)]
+            item = {"x": x, "y": y, "t": tag}
+            if tag == PLAYER:
+                item["id"] = meta
+            vision.append(item)
+        return {
+            "tick": tick,
+            "self": {"id": p.agentId, "pos": {"x": p.x, "y": p.y}, "score": p.score},
+            "vision": vision,
+            "bounds": {"w": board.w, "h": board.h},
+            "rules": {"sight": self.sight, "moveSet": list(MOVE_SET)},
+            "stats": {"remainingGreens": len(board.greens)}
+        }
+
+# ---------- Helpers that accept either observation form ----------
+def selfPos(obs):
+    if isinstance(obs, CompactObservation):
+        return (obs.x, obs.y)
+    pos = obs["self"]["pos"]
+    return (pos["x"], pos["y"])
+
+def sightOf(obs):
+    if isinstance(obs, CompactObservation):
+        return obs.sight
+    return obs["rules"]["sight"]
+
+def boardBounds(obs):
+    if isinstance(obs, CompactObservation):
+        return (obs.w, obs.h)
+    return (obs["bounds"]["w"], obs["bounds"]["h"])
+
+def visibleCells(obs, tag):
+    # Coordinates of visible GREEN or RED items, in vision order
+    if isinstance(obs, CompactObservation):
+        return obs.greens if tag == GREEN else obs.reds
+    return [(v["x"], v["y"]) for v in obs["vision"] if v["t"] == tag]
+
+def visiblePlayers(obs):
+    # (agentId, x, y) of visible players, self included
+    if isinstance(obs, CompactObservation):
+        return obs.players
+    return [(v.get("id"), v["x"], v["y"]) for v in obs["vision"] if v["t"] == PLAYER]
+
 def classify(board, x, y):
     # Priority: players, reds, greens
-    for p in board.players:
-        if p.x == x and p.y == y:
-            return (PLAYER, p.agentId)
-    for r in board.reds:
-        if r.x == x and r.y == y:
-            return (RED, None)
-    for g in board.greens:
-        if g[0] == x and g[1] == y:
-            return (GREEN, None)
+    players = board.playerCells.get((x, y))
+    if players:
+        return (PLAYER, players[0].agentId)
+    if (x, y) in board.redCells:
+        return (RED, None)
+    if (x, y) in board.greens:
+        return (GREEN, None)
     return (EMPTY, None)
@@ -1,6 +1,20 @@
 # Entry point
+#
+#   python main.py                          # standard game (settings.py)
+#   python main.py --config match.json      # MatchConfig JSON: board, counts, rules, agents
 
-from engine.game import Game
+import argparse
+from engine.config import MatchConfig
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Play GeomLab in a window.")
+    ap.add_argument("--config", help="MatchConfig JSON file")
+    ap.add_argument("--seed", type=int, default=None, help="board seed (overrides the config's)")
+    args = ap.parse_args(argv)
+    config = MatchConfig.load(args.config) if args.config else None
+    # pygame and the renderer load here, after arguments and config are known to be valid
+    from engine.game import Game
+    Game(seed=args.seed, config=config).run()
 
 if __name__ == "__main__":
-    Game().run()
+    main()
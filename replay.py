@@ -0,0 +1,78 @@
+# Replay viewer — scrub through a recorded .glr match
+#
+#   python replay.py replays/triangle+pentagon+pentagon-7.glr --tick 120
+#
+# Keys: LEFT/RIGHT one tick, UP/DOWN one keyframe, HOME/END first/last tick, SPACE play/pause
+
+import argparse
+import pygame
+from settings import CELL, PANEL_W, FONT_NAME, FPS, TURN_DELAY_MS
+from engine.renderer import drawBoard, drawPanel
+from engine.logger import ThoughtsLogger
+from engine.replay import ReplayReader
+
+PANEL_TICKS = 8  # ticks of decisions shown in the side panel
+
+def panelLog(reader, tick):
+    logger = ThoughtsLogger()
+    for turn in reader.turns(max(0, tick - PANEL_TICKS), tick):
+        logger.append(turn.agentId, turn.header(), turn.thoughts)
+    return logger
+
+def view(path, tick=0):
+    reader = ReplayReader(path)
+    last = reader.lastTick
+    pygame.init()
+    screen = pygame.display.set_mode((reader.w * CELL + PANEL_W, reader.h * CELL))
+    pygame.display.set_caption(f"GeomLab replay — {path}")
+    fonts = (pygame.font.SysFont(FONT_NAME, 16), pygame.font.SysFont(FONT_NAME, 20))
+    clock = pygame.time.Clock()
+
+    playing = False
+    shown = None
+    lastStep = pygame.time.get_ticks()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                step = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1,
+                        pygame.K_DOWN: -reader.keyframeEvery, pygame.K_UP: reader.keyframeEvery}.get(event.key)
+                if step:
+                    tick += step
+                elif event.key == pygame.K_HOME:
+                    tick = 0
+                elif event.key == pygame.K_END:
+                    tick = last
+                elif event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key in (pygame.K_ESCAPE, pygame.K_q):
+                    running = False
+        now = pygame.time.get_ticks()
+        if playing and now - lastStep >= TURN_DELAY_MS:
+            tick += 1
+            lastStep = now
+        tick = min(max(tick, 0), last)
+
+        if tick != shown:
+            board, state = reader.board(tick)
+            activeId = reader.seats[state.activeIdx][0]
+            drawBoard(screen, board, activeId, fonts[0], fonts[1], reader.sightRange)
+            drawPanel(screen, board, activeId, panelLog(reader, tick), fonts, tick)
+            pygame.display.flip()
+            shown = tick
+        clock.tick(FPS)
+
+    reader.close()
+    pygame.quit()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="View a recorded GeomLab match.")
+    ap.add_argument("path", help=".glr replay file")
+    ap.add_argument("--tick", type=int, default=0, help="tick to open at")
+    args = ap.parse_args(argv)
+    view(args.path, args.tick)
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ MAX_ROUNDS = 200
 NUM_GREENS = 30
 NUM_REDS = 10
 RED_MOVE_PROB = 0.5  # 50% chance to move each round
+NPC_MODE = "seeded"  # "seeded": reproducible red paths per seed; "vectorized": one NumPy draw per NPC phase
 
 SCORES = {
     "GREEN": 1,
@@ -26,7 +27,33 @@ SCORES = {
 }
 
 FPS = 60  # render FPS
+RENDER_MODE = "full"  # "full" redraws every frame; "dirty" pushes changed rects and sleeps when idle
+IDLE_WAIT_MS = 1000  # dirty mode: longest sleep on the event queue while nothing can change
+THINKING_REFRESH_MS = 100  # dirty mode: refresh rate of the "thinking…" timer
 TURN_DELAY_MS = 150  # pause between individual decisions for readability
+DECISION_DEADLINE_MS = 30000  # per-turn budget for a controller before falling back to STAY
+DECISION_WORKERS = 2  # worker threads running controller decisions off the render loop
+LLM_PREFETCH = True  # start an LLM agent's request as soon as the agent before it has moved
+LLM_MAX_CONCURRENCY = 8  # shared LLM scheduler: requests on the wire at once, across all games
+LLM_RATE_LIMIT = None  # shared LLM scheduler: requests per second (None = unlimited)
+LLM_RATE_BURST = None  # shared LLM scheduler: requests allowed back to back (None = one second's worth)
+TURN_MODE = "sequential"  # "simultaneous": all agents decide on the same snapshot, moves resolve in seat order
+ROUND_THREADS = 16  # simultaneous mode: threads running one round's decide() calls
+ROUND_PROCESSES = 0  # simultaneous mode: processes for cpuBound controllers (e.g. mcts); 0 = threads only
+INCREMENTAL_OBSERVATION = False  # patch LLM/human observations from board change events instead of rebuilding them
 
 FONT_NAME = "consolas"  # fallback handled by pygame if missing
+TEXT_CACHE_SIZE = 512  # rendered text surfaces kept for reuse by the side panel
 LOG_HISTORY_PER_AGENT = 120  # number of lines to keep in memory
+THOUGHTS_LOG_DIR = None  # folder for the full thoughts log (gzip JSONL, written in the background); None = memory only
+THOUGHTS_LOG_MAX_MB = 64  # start a new log file after this much (uncompressed) text
+THOUGHTS_LOG_FLUSH_MS = 1000  # how often the background writer flushes to disk
+
+REPLAY_DIR = None  # folder for .glr replays of windowed matches (None = don't record)
+REPLAY_KEYFRAME_EVERY = 20  # ticks between full-state keyframes (seek cost vs file size)
+
+TELEMETRY = False  # time turn phases and frames (engine/telemetry.py); off = no timing calls at all
+TELEMETRY_OVERLAY = True  # with TELEMETRY on, show live timings at the bottom of the side panel
+TELEMETRY_OVERLAY_MS = 250  # how often the overlay text is refreshed
+TELEMETRY_DIR = "telemetry"  # telemetry.jsonl (appended) and geomlab.prom (Prometheus textfile) go here
+TELEMETRY_EXPORT_MS = 5000  # export interval while the window is open (and once more on exit)
@@ -0,0 +1,9 @@
+# BatchEnv must replay the scalar engine exactly: same observations, moves, reds and scores
+
+import pytest
+
+from benchmarks.batch import checkParity
+
+@pytest.mark.parametrize("seed", [0, 1])
+def testBatchParity(seed):
+    assert checkParity(list(range(16)), 600, seed=seed) == 0
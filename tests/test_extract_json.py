@@ -0,0 +1,21 @@
+# The rectangle's LLM-answer parser against the response corpus, plus malformed input at scale
+
+import time
+
+import pytest
+
+from benchmarks.extract_json import CORPUS, loadCorpus
+from controllers.rectangle_controller import extract_json
+
+ENTRIES = loadCorpus(CORPUS)
+
+@pytest.mark.parametrize("entry", ENTRIES, ids=[e["name"] for e in ENTRIES])
+def testCorpus(entry):
+    assert extract_json(entry["response"]) == entry["expected"]
+
+def testUnclosedBracesStayLinear():
+    # Retrying from every '{' is quadratic here (seconds); the single pass takes milliseconds
+    text = '{"a" x ' * 40000 + '{"move": "UP"}'
+    started = time.perf_counter()
+    assert extract_json(text) == {"move": "UP"}
+    assert time.perf_counter() - started < 1.0
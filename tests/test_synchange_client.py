@@ -0,0 +1,115 @@
+# SynchangeLLM against the local stub: cache and accept rules, retries, backoff, stats() counters, errors
+
+import random
+import time
+
+import pytest
+
+from benchmarks.synchange_stub import StubServer, cannedAnswer
+from controllers.llm_cache import LLMCache, cache_key
+from controllers.synchange_llm import SynchangeLLM
+
+def client(url, retries=3, backoff=0.01, backoffMax=0.04, **kwargs):
+    return SynchangeLLM(model="stub", api_url=url, sender="check", retries=retries, timeout=5,
+                        backoff=backoff, backoff_max=backoffMax, **kwargs)
+
+def counters(llm, *keys):
+    s = llm.stats()
+    return tuple(s[k] for k in keys)
+
+@pytest.fixture
+def stub():
+    with StubServer(latencyMs=0, jitterMs=0, errorRate=0.0) as server:
+        yield server
+
+def sent(stub):
+    return stub.stats()["requests"]
+
+def testAnswerAndCounters(stub):
+    llm = client(stub.url)
+    assert llm.send_request("hello") == cannedAnswer(llm.full_prompt("hello"))
+    assert counters(llm, "requests", "attempts", "retries", "failures") == (1, 1, 0, 0)
+    assert sent(stub) == 1 and "latency_p50" in llm.stats()
+
+def testCacheKeepsAcceptedAnswers(stub):
+    llm = client(stub.url, cache=LLMCache())
+    assert llm.send_request("same prompt") == llm.send_request("same prompt")
+    assert sent(stub) == 1 and llm.stats()["cache_hits"] == 1
+
+def testCacheSkipsRejectedAnswers(stub):
+    llm = client(stub.url, cache=LLMCache(), accept=lambda answer: False)
+    llm.send_request("same prompt")
+    llm.send_request("same prompt")
+    assert sent(stub) == 2 and llm.stats()["cache_hits"] == 0
+
+def testCacheSkipsErrorAnswers(stub):
+    llm = client(stub.url, retries=1, cache=LLMCache())
+    stub.errorRate = 1.0
+    assert llm.send_request("same prompt").startswith("Error:")
+    stub.errorRate = 0.0
+    assert llm.send_request("same prompt") == cannedAnswer(llm.full_prompt("same prompt"))
+    assert sent(stub) == 2 and llm.stats()["cache_hits"] == 0
+
+def testCachedAnswerFailingAcceptIsDiscarded(stub):
+    cache = LLMCache()
+    llm = client(stub.url, cache=cache, accept=lambda answer: answer.startswith("{"))
+    key = cache_key(llm.model, llm.service_name, llm.full_prompt("same prompt"))
+    cache.put(key, "not a decision")
+    answer = llm.send_request("same prompt")
+    assert answer == cannedAnswer(llm.full_prompt("same prompt"))
+    assert sent(stub) == 1 and cache.get(key) == answer
+
+def testOfflineMiss(stub):
+    llm = client(stub.url, cache=LLMCache(offline=True))
+    assert llm.send_request("never seen") == "Error: offline cache miss"
+    assert sent(stub) == 0 and llm.stats()["failures"] == 1
+
+def expectedCounters(n, retries, errorRate, seed):
+    # The stub draws one random() per request in arrival order; sequential calls make that replayable
+    rng = random.Random(seed)
+    counts = {"requests": n, "attempts": 0, "retries": 0, "failures": 0}
+    for _ in range(n):
+        for attempt in range(1, retries + 1):
+            counts["attempts"] += 1
+            if attempt > 1:
+                counts["retries"] += 1
+            if rng.random() >= errorRate:
+                break
+        else:
+            counts["failures"] += 1
+    return counts
+
+def testCountersUnderErrors():
+    n, retries, errorRate, seed = 100, 3, 0.3, 7
+    with StubServer(latencyMs=0, jitterMs=0, errorRate=errorRate, seed=seed) as stub:
+        llm = client(stub.url, retries, backoff=0.0)
+        for i in range(n):
+            llm.send_request(f"prompt {i}")
+        want = expectedCounters(n, retries, errorRate, seed)
+        assert {k: llm.stats()[k] for k in want} == want
+        assert sent(stub) == want["attempts"]
+
+def testGivesUpWithCappedBackoff(stub):
+    stub.errorRate = 1.0
+    llm = client(stub.url, retries=4, backoff=0.05, backoffMax=0.08)
+    started = time.perf_counter()
+    answer = llm.send_request("always fails")
+    elapsed = time.perf_counter() - started
+    assert answer.startswith("Error:")
+    assert counters(llm, "attempts", "retries", "failures") == (4, 3, 1)
+    # sleeps 0.05 + 0.08 + 0.08 (capped) between the four attempts
+    assert 0.21 <= elapsed < 1.0
+
+def testChatReportsHttpErrors(stub):
+    stub.errorRate = 1.0
+    llm = client(stub.url)
+    answer = llm.chat("always fails")["response"]
+    assert answer.startswith("Error: HTTP 500") and "stub failure" in answer
+    assert llm.stats()["failures"] == 1
+
+@pytest.mark.parametrize("url", ["not a url", "http://127.0.0.1:1/"])
+def testChatTransportFailure(url):
+    llm = client(url)
+    answer = llm.chat("hello")["response"]
+    assert answer.startswith("Error:") and "Invalid JSON" not in answer
+    assert llm.stats()["failures"] == 1
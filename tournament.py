@@ -0,0 +1,139 @@
+# Tournament entry point — play seeded matches in parallel and stream results
+#
+#   python tournament.py --seeds 0:500 --lineup triangle,pentagon,pentagon \
+#                        --lineup pentagon,triangle,triangle --out results.jsonl
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine.simulation import Simulation
+from engine.config import MatchConfig
+from engine.logger import ThoughtsLogger, LogSink
+from controllers import registry
+
+DEFAULT_LINEUP = ["triangle", "pentagon", "pentagon"]
+
+def matchConfig(base, seed, lineup):
+    # The base config with this match's seed and, if given, a plain line-up of controller names
+    cfg = base.copy(seed=seed)
+    return cfg.withLineup(lineup) if lineup else cfg
+
+def playMatch(seed, lineup, replayDir=None, base=None, thoughtsDir=None):
+    """Play one headless match; runs inside a worker process."""
+    started = time.perf_counter()
+    cfg = matchConfig(base or MatchConfig(), seed, lineup)
+    tag = "+".join(lineup) if lineup else "config"
+    logger = None
+    if thoughtsDir:
+        logger = ThoughtsLogger(LogSink(thoughtsDir, f"{tag}-{seed}"), {"seed": seed})
+    try:
+        if replayDir:
+            from engine.replay import ReplayRecorder
+            path = os.path.join(replayDir, f"{tag}-{seed}.glr")
+            with ReplayRecorder(path) as rec:
+                res = Simulation.fromConfig(cfg, recorder=rec, logger=logger).runToEnd()
+        else:
+            res = Simulation.fromConfig(cfg, logger=logger).runToEnd()
+    finally:
+        if logger is not None:
+            logger.close()
+    res.update({
+        "seed": seed,
+        "lineup": list(lineup or [a["controller"] for a in cfg.agents]),
+        "elapsed": round(time.perf_counter() - started, 4),
+    })
+    return res
+
+def parseSeeds(spec):
+    # "0:100" -> range(0, 100); "1,5,9" -> [1, 5, 9]
+    if ":" in spec:
+        lo, hi = spec.split(":", 1)
+        return list(range(int(lo), int(hi)))
+    return [int(s) for s in spec.split(",") if s]
+
+def parseLineup(spec):
+    names = [n.strip() for n in spec.split(",") if n.strip()]
+    if not names:
+        raise argparse.ArgumentTypeError(f"line-up needs at least one controller, got '{spec}'")
+    for name in names:
+        try:
+            registry.resolve(name)
+        except KeyError as e:
+            raise argparse.ArgumentTypeError(str(e))
+        if registry.ALIASES.get(name, name) == "human":
+            raise argparse.ArgumentTypeError("human controllers cannot play headless matches")
+    return names
+
+class ResultSink:
+    """Append-only JSONL or CSV writer, flushed after every match."""
+    def __init__(self, path, agentIds):
+        self.path = path
+        self.csv = path.lower().endswith(".csv")
+        self.fh = open(path, "w", newline="" if self.csv else None, encoding="utf-8")
+        self.writer = None
+        if self.csv:
+            cols = ["seed", "lineup", "ticks", "remainingGreens", "elapsed"] + list(agentIds)
+            self.writer = csv.DictWriter(self.fh, fieldnames=cols)
+            self.writer.writeheader()
+
+    def write(self, res):
+        if self.csv:
+            row = {k: res[k] for k in ("seed", "ticks", "remainingGreens", "elapsed")}
+            row["lineup"] = "+".join(res["lineup"])
+            row.update(res["scores"])
+            self.writer.writerow(row)
+        else:
+            self.fh.write(json.dumps(res) + "\n")
+        self.fh.flush()
+
+    def close(self):
+        self.fh.close()
+
+def runTournament(seeds, lineups, out, workers=None, replayDir=None, base=None, thoughtsDir=None):
+    # lineups: lists of controller names, or None to play base.agents as configured
+    base = base or MatchConfig()
+    matches = [(seed, lineup) for lineup in lineups for seed in seeds]
+    if replayDir:
+        os.makedirs(replayDir, exist_ok=True)
+    agentIds = {}
+    for lineup in lineups:
+        for seat in matchConfig(base, base.seed, lineup).seats():
+            agentIds.setdefault(seat["id"], None)
+    sink = ResultSink(out, agentIds)
+    done = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [pool.submit(playMatch, seed, lineup, replayDir, base, thoughtsDir)
+                       for seed, lineup in matches]
+            for fut in as_completed(futures):
+                sink.write(fut.result())
+                done += 1
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - started
+    print(f"{done} matches in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.1f} matches/s) -> {out}", file=sys.stderr)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run seeded GeomLab matches across all cores.")
+    ap.add_argument("--seeds", default="0:100", help="seed range 'lo:hi' or list 'a,b,c'")
+    ap.add_argument("--lineup", action="append", type=parseLineup,
+                    help="comma-separated controllers in seat order (triangle, rectangle, pentagon, agent3, ...); repeatable")
+    ap.add_argument("--config", help="MatchConfig JSON (board, counts, rules, agents); --lineup overrides its agents")
+    ap.add_argument("--out", default="results.jsonl", help="output file (.jsonl or .csv)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument("--replays", help="folder for one .glr replay per match (view with replay.py)")
+    ap.add_argument("--thoughts", help="folder for every agent's full thoughts log (gzip JSONL per match)")
+    args = ap.parse_args(argv)
+
+    base = MatchConfig.load(args.config) if args.config else MatchConfig()
+    lineups = args.lineup or ([None] if args.config else [DEFAULT_LINEUP])
+    runTournament(parseSeeds(args.seeds), lineups, args.out, args.workers, args.replays, base, args.thoughts)
+
+if __name__ == "__main__":
+    main()